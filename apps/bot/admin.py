@@ -2,6 +2,10 @@
 
 from django.contrib import admin
 
-from apps.bot.models import Educator
+from apps.bot.models import Educator, Lesson, ScheduleChange, ScheduleFile, ScheduleSheet
 
 admin.site.register(Educator)
+admin.site.register(ScheduleFile)
+admin.site.register(ScheduleSheet)
+admin.site.register(Lesson)
+admin.site.register(ScheduleChange)
@@ -8,3 +8,7 @@ class BotConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.bot'
+
+    def ready(self: 'BotConfig') -> None:
+        """Подключает обработчики сигналов приложения."""
+        from apps.bot import signals  # noqa: F401, PLC0415
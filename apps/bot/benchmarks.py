@@ -0,0 +1,194 @@
+"""Модуль замеров производительности разбора, форматирования и запросов расписания."""
+
+import platform
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+import openpyxl
+from django.conf import settings
+from django.core.cache import caches
+from django.test import Client, override_settings
+
+from apps.bot import schedule_index, utils
+from apps.bot.caching import is_cache_shared
+from apps.bot.content_cache import clear_content_caches
+
+PROFILES = {
+    'realistic': {'sheets': 6, 'groups': 60, 'triples_per_row': 10, 'class_hour': True},
+    'stress': {'sheets': 10, 'groups': 600, 'triples_per_row': 30, 'class_hour': False},
+}
+
+_FILE_NAME = '01.09.2024'
+
+
+def generate_workbook(
+    sheets: int, groups: int, triples_per_row: int, *, class_hour: bool,
+) -> bytes:
+    """Создает синтетический файл расписания.
+
+    Каждый лист - пара, в строках листа тройки кабинет, группа, преподаватель; у каждой
+    группы одно занятие на лист, на одного преподавателя приходится две группы. При
+    class_hour в первый лист добавляется классный час.
+    """
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for sheet_number in range(1, sheets + 1):
+        sheet = wb.create_sheet(f'{sheet_number} пара')
+        sheet.append(('Кабинет', 'Группа', 'Преподаватель') * triples_per_row)
+        for start in range(0, groups, triples_per_row):
+            row = []
+            for group in range(start, min(start + triples_per_row, groups)):
+                teacher = (group + sheet_number) % max(groups // 2, 1)
+                row.extend((100 + group, f'ГР-{group:03d}', f'Преподаватель{teacher} А.А.'))
+            sheet.append(row)
+        if class_hour and sheet_number == 1:
+            sheet.append(('Актовый зал', 'ГР-000', 'Классный час'))
+
+    content = BytesIO()
+    wb.save(content)
+    return content.getvalue()
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """Возвращает перцентиль выборки методом ближайшего ранга."""
+    ordered = sorted(samples)
+    rank = max(round(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    """Возвращает сводку по времени выполнения в миллисекундах."""
+    return {
+        'runs': len(samples),
+        'mean_ms': round(sum(samples) / len(samples), 3),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+    }
+
+
+def measure(func: Callable[[], Any], iterations: int) -> dict[str, float]:
+    """Замеряет время выполнения функции и пик выделенной ей памяти."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {**_summary(samples), 'peak_kib': round(peak / 1024, 1)}
+
+
+def isolated_caches() -> override_settings:
+    """Подменяет кэш ответов отдельным кэшем в памяти процесса на время замеров.
+
+    Замеры очищают кэш ответов, поэтому не должны работать с общим кэшем развертывания
+    (Redis, Memcached), в котором хранятся тексты расписаний всех процессов сервера.
+    """
+    return override_settings(CACHES={
+        **settings.CACHES,
+        settings.SCHEDULE_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'schedule-benchmarks',
+        },
+    })
+
+
+def reset_caches() -> None:
+    """Сбрасывает все кэши расписания в процессе.
+
+    Кэш ответов очищается, только если он хранится в памяти процесса; общий кэш
+    развертывания не затрагивается.
+    """
+    utils._FOLDER_LISTING.invalidate()  # noqa: SLF001
+    schedule_index.clear_indexes()
+    clear_content_caches()
+    if not is_cache_shared():
+        caches[settings.SCHEDULE_CACHE_ALIAS].clear()
+
+
+def _stages(content: bytes, iterations: int) -> dict[str, dict]:
+    """Замеряет отдельные этапы обработки файла."""
+    index = schedule_index.build_index(BytesIO(content))
+    group = next(iter(index.groups))
+    teacher = next(iter(index.teachers))
+    group_text = utils.render_group_schedule(index, group)
+
+    return {
+        'build_index': measure(lambda: schedule_index.build_index(BytesIO(content)), iterations),
+        'process_excel': measure(lambda: utils.process_excel(BytesIO(content), group), iterations),
+        'process_excel2': measure(
+            lambda: utils.process_excel2(BytesIO(content), teacher), iterations,
+        ),
+        'for_group': measure(lambda: index.for_group(group), iterations),
+        'for_teacher': measure(lambda: index.for_teacher(teacher), iterations),
+        'render_group': measure(lambda: utils.render_group_schedule(index, group), iterations),
+        'render_teacher': measure(
+            lambda: utils.render_teacher_schedule(index, teacher), iterations,
+        ),
+        'form_schedule': measure(lambda: utils.form_schedule(group_text), iterations),
+    }
+
+
+def _endpoint(client: Client, path: str, queries: list[str], requests: int) -> dict:
+    """Замеряет задержку запросов к представлению: первый (холодный) и последующие."""
+    reset_caches()
+    samples = []
+    for number in range(requests + 1):
+        started = time.perf_counter()
+        response = client.get(path, {'date': _FILE_NAME, 'group': queries[number % len(queries)]})
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:  # noqa: PLR2004
+            msg = f'{path} вернул {response.status_code}'
+            raise RuntimeError(msg)
+        samples.append(elapsed)
+
+    return {'cold_ms': round(samples[0], 3), **_summary(samples[1:])}
+
+
+def run_benchmarks(profile: str, iterations: int, requests: int) -> dict[str, Any]:
+    """Выполняет замеры для профиля синтетического файла и возвращает отчет.
+
+    Запросы к представлениям выполняются через тестовый клиент Django с локальной папкой
+    вместо Google Drive, поэтому замеры не требуют сети.
+    """
+    params = PROFILES[profile]
+    content = generate_workbook(**params)
+    index = schedule_index.build_index(BytesIO(content))
+    lessons = sum(map(len, index.groups.values()))
+
+    with tempfile.TemporaryDirectory() as folder:
+        (Path(folder) / f'{_FILE_NAME}.xlsx').write_bytes(content)
+        with isolated_caches(), override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            SCHEDULE_LOCAL_FOLDER=Path(folder),
+            SCHEDULE_USE_MIRROR=False,
+        ):
+            client = Client()
+            endpoints = {
+                '/api/service/': _endpoint(
+                    client, '/api/service/', list(index.groups), requests,
+                ),
+                '/api/teachers/': _endpoint(
+                    client, '/api/teachers/', list(index.teachers), requests,
+                ),
+            }
+            reset_caches()
+
+    return {
+        'profile': profile,
+        'python': platform.python_version(),
+        'workbook': {**params, 'bytes': len(content), 'lessons': lessons},
+        'stages': _stages(content, iterations),
+        'endpoints': endpoints,
+    }
@@ -0,0 +1,71 @@
+"""Модуль кэширования готовых текстов расписания и их валидаторов для условных запросов."""
+
+import hashlib
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import quote_etag
+
+from apps.bot.metrics import count_cache
+
+# Увеличивается при изменении формата текста расписания, чтобы не отдавать старые ответы.
+_RENDER_VERSION = 3
+
+
+def _fingerprint(kind: str, file: dict, query: str) -> str:
+    """Возвращает хэш версии файла и нормализованного запроса."""
+    key = '\0'.join(
+        (str(_RENDER_VERSION), kind, file['id'], file.get('modifiedTime', ''), query),
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def etag_for(kind: str, file: dict, query: str) -> str:
+    """Возвращает ETag ответа на запрос расписания по заданному файлу."""
+    return quote_etag(_fingerprint(kind, file, query)[:32])
+
+
+def last_modified_for(file: dict) -> int | None:
+    """Возвращает время изменения файла в секундах или None, если оно неизвестно."""
+    try:
+        modified = datetime.strptime(file.get('modifiedTime', ''), '%Y-%m-%dT%H:%M:%S.%f%z')
+    except ValueError:
+        return None
+    return int(modified.timestamp())
+
+
+def is_cache_shared() -> bool:
+    """Проверяет, виден ли кэш ответов другим процессам (например, Redis или Memcached)."""
+    return not isinstance(caches[settings.SCHEDULE_CACHE_ALIAS], LocMemCache | DummyCache)
+
+
+def render_cached(kind: str, file: dict, query: str, render: Callable[[], str]) -> str:
+    """Возвращает текст расписания из кэша или формирует и сохраняет его."""
+    cache = caches[settings.SCHEDULE_CACHE_ALIAS]
+    key = f'schedule:{_fingerprint(kind, file, query)}'
+
+    text = cache.get(key)
+    count_cache('response', hit=text is not None)
+    if text is None:
+        text = render()
+        cache.set(key, text, settings.SCHEDULE_RESPONSE_CACHE_TTL)
+    return text
+
+
+async def arender_cached(
+    kind: str, file: dict, query: str, render: Callable[[], Awaitable[str]],
+) -> str:
+    """Асинхронно возвращает текст расписания из кэша или формирует и сохраняет его."""
+    cache = caches[settings.SCHEDULE_CACHE_ALIAS]
+    key = f'schedule:{_fingerprint(kind, file, query)}'
+
+    text = await cache.aget(key)
+    count_cache('response', hit=text is not None)
+    if text is None:
+        text = await render()
+        await cache.aset(key, text, settings.SCHEDULE_RESPONSE_CACHE_TTL)
+    return text
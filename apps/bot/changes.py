@@ -0,0 +1,124 @@
+"""Модуль вычисления и выборки изменений расписания между версиями файла."""
+
+from collections import Counter
+from collections.abc import Iterable
+
+from django.db.models import Q
+
+from apps.bot.models import Lesson, ScheduleChange, ScheduleFile
+from apps.bot.schedule_index import surname_key
+from apps.bot.utils import group_query
+
+_LESSON_FIELDS = ('title', 'pair', 'room', 'group', 'teacher', 'class_hour')
+
+LessonKey = tuple[str, int | None, str, str, str, bool]
+
+
+def lesson_key(lesson: Lesson) -> LessonKey:
+    """Возвращает занятие в виде кортежа, по которому сравниваются версии файла."""
+    return (
+        lesson.sheet.title,
+        lesson.pair_number,
+        lesson.room,
+        lesson.group,
+        lesson.teacher_name,
+        lesson.class_hour,
+    )
+
+
+def _by_owner(lessons: Iterable[LessonKey]) -> dict[tuple[str, str], Counter]:
+    """Раскладывает занятия по группам и фамилиям преподавателей."""
+    owners: dict[tuple[str, str], Counter] = {}
+    for lesson in lessons:
+        _, _, _, group, teacher, _ = lesson
+        if group:
+            owners.setdefault((ScheduleChange.GROUP, group), Counter())[lesson] += 1
+        surname = surname_key(teacher)
+        if surname:
+            owners.setdefault((ScheduleChange.TEACHER, surname), Counter())[lesson] += 1
+    return owners
+
+
+def diff_lessons(
+    old: Iterable[LessonKey], new: Iterable[LessonKey],
+) -> list[tuple[str, str, list[dict], list[dict]]]:
+    """Сравнивает две версии занятий файла.
+
+    Возвращает для каждой затронутой группы и фамилии преподавателя кортеж тип, ключ,
+    добавленные занятия, удаленные занятия.
+    """
+    old_owners, new_owners = _by_owner(old), _by_owner(new)
+    changes = []
+    for owner in sorted(old_owners.keys() | new_owners.keys()):
+        old_lessons = old_owners.get(owner, Counter())
+        new_lessons = new_owners.get(owner, Counter())
+        added = list((new_lessons - old_lessons).elements())
+        removed = list((old_lessons - new_lessons).elements())
+        if added or removed:
+            kind, key = owner
+            changes.append((
+                kind,
+                key,
+                [dict(zip(_LESSON_FIELDS, lesson, strict=True)) for lesson in added],
+                [dict(zip(_LESSON_FIELDS, lesson, strict=True)) for lesson in removed],
+            ))
+    return changes
+
+
+def record_changes(
+    schedule_file: ScheduleFile,
+    previous_version: str,
+    old: Iterable[LessonKey],
+    new: Iterable[LessonKey],
+) -> list[ScheduleChange]:
+    """Сохраняет изменения занятий между предыдущей и текущей версиями файла."""
+    return ScheduleChange.objects.bulk_create(
+        ScheduleChange(
+            schedule_file=schedule_file,
+            version=schedule_file.modified_time,
+            previous_version=previous_version,
+            kind=kind,
+            key=key,
+            added=added,
+            removed=removed,
+        )
+        for kind, key, added, removed in diff_lessons(old, new)
+    )
+
+
+def changes_since(
+    schedule_file: ScheduleFile,
+    since: str = '',
+    group: str | None = None,
+    teacher: str | None = None,
+) -> list[ScheduleChange]:
+    """Возвращает изменения файла в версиях новее заданной.
+
+    Версии - значения modifiedTime из Google Drive, поэтому сравниваются как строки.
+    Изменения можно ограничить группой и (или) фамилией преподавателя.
+    """
+    owners = Q()
+    if group:
+        owners |= Q(kind=ScheduleChange.GROUP, key=group)
+    if teacher:
+        owners |= Q(kind=ScheduleChange.TEACHER, key=surname_key(teacher))
+    return list(schedule_file.changes.filter(owners, version__gt=since))
+
+
+def schedule_changes(
+    name: str, since: str = '', group: str | None = None, teacher: str | None = None,
+) -> dict | None:
+    """Предоставляет изменения расписания на дату или None, если файл не импортирован."""
+    schedule_file = (
+        ScheduleFile.objects.filter(name=name + '.xlsx').order_by('-imported_at').first()
+    )
+    if schedule_file is None:
+        return None
+
+    return {
+        'date': name,
+        'version': schedule_file.modified_time,
+        'changes': changes_since(
+            schedule_file, since, group_query(group) if group else None, teacher,
+        ),
+    }
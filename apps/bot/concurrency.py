@@ -0,0 +1,68 @@
+"""Модуль пулов потоков и ограничений для асинхронной обработки запросов."""
+
+import asyncio
+import functools
+import threading
+import weakref
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from django.conf import settings
+
+T = TypeVar('T')
+
+_LOCK = threading.Lock()
+
+_EXECUTORS: dict[str, ThreadPoolExecutor] = {}
+
+_SEMAPHORES: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Возвращает именованный пул потоков, общий для процесса."""
+    with _LOCK:
+        if name not in _EXECUTORS:
+            _EXECUTORS[name] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=f'schedule-{name}',
+            )
+        return _EXECUTORS[name]
+
+
+async def run_io(func: Callable[..., T], *args: Any) -> T:
+    """Выполняет блокирующую операцию ввода-вывода (запрос к Google Drive) в пуле потоков."""
+    executor = get_executor('io', settings.SCHEDULE_ASYNC_IO_WORKERS)
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(func, *args),
+    )
+
+
+async def run_cpu(func: Callable[..., T], *args: Any) -> T:
+    """Выполняет разбор Excel файла в ограниченном пуле потоков."""
+    executor = get_executor('parse', settings.SCHEDULE_PARSE_WORKERS)
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(func, *args),
+    )
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Возвращает семафор числа одновременно обрабатываемых запросов для текущего цикла."""
+    loop = asyncio.get_running_loop()
+    if loop not in _SEMAPHORES:
+        _SEMAPHORES[loop] = asyncio.Semaphore(settings.SCHEDULE_ASYNC_MAX_CONCURRENCY)
+    return _SEMAPHORES[loop]
+
+
+async def limited(awaitable: Awaitable[T]) -> T:
+    """Выполняет обработку запроса с ограничением числа одновременных запросов и таймаутом.
+
+    Таймаут учитывает и время ожидания свободного места.
+    """
+
+    async def run() -> T:
+        async with _get_semaphore():
+            return await awaitable
+
+    return await asyncio.wait_for(run(), timeout=settings.SCHEDULE_ASYNC_TIMEOUT)
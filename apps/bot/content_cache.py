@@ -0,0 +1,190 @@
+"""Модуль кэша содержимого скачанных файлов расписания с ограничением по объему."""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from apps.bot.metrics import count_cache
+from apps.bot.mirror import write_atomic
+
+Key = tuple[str, str]
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _digest(value: str) -> str:
+    """Возвращает короткий хэш строки для имени файла на диске."""
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+class ContentCache:
+    """LRU кэш содержимого файлов по идентификатору и версии файла.
+
+    Общий объем содержимого в памяти не превышает max_bytes: при добавлении файла
+    вытесняются давно не использованные. Если задана папка spill_dir, вытесненные файлы
+    сохраняются в ней и читаются оттуда вместо повторного скачивания; объем папки
+    ограничен spill_max_bytes, сверх него удаляются давно не читавшиеся файлы.
+    """
+
+    def __init__(
+        self: 'ContentCache',
+        max_bytes: int,
+        spill_dir: Path | None = None,
+        spill_max_bytes: int | None = None,
+    ) -> None:
+        """Создает кэш с заданным объемом и необязательной папкой для вытесненных файлов."""
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_max_bytes = spill_max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Key, bytes] = OrderedDict()
+        self._size = 0
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _spill_path(self: 'ContentCache', key: Key) -> Path:
+        """Путь к вытесненному файлу на диске."""
+        file_id, version = key
+        return self.spill_dir / f'{_digest(file_id)}.{_digest(version)}'
+
+    def _spill(self: 'ContentCache', key: Key, content: bytes) -> None:
+        """Сохраняет содержимое на диск, удаляя там другие версии того же файла.
+
+        Ошибка записи не прерывает запрос: содержимое уже получено, вытесненная запись
+        просто не сохраняется и при следующем обращении будет скачана заново.
+        """
+        if self.spill_dir is None:
+            return
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            path = self._spill_path(key)
+            for stale in self.spill_dir.glob(f'{_digest(key[0])}.*'):
+                if stale != path and stale.suffix != '.tmp':
+                    stale.unlink(missing_ok=True)
+            write_atomic(path, content)
+            self._prune_spilled()
+        except OSError:
+            LOGGER.exception('Не удалось сохранить вытесненный файл %s на диск', key[0])
+
+    def _prune_spilled(self: 'ContentCache') -> None:
+        """Удаляет давно не читавшиеся файлы, пока объем папки превышает лимит."""
+        if self.spill_max_bytes is None:
+            return
+        spilled = []
+        for path in self.spill_dir.iterdir():
+            if path.suffix == '.tmp':
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            spilled.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in spilled)
+        for _, size, path in sorted(spilled):
+            if total <= self.spill_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _read_spilled(self: 'ContentCache', key: Key) -> bytes | None:
+        """Читает вытесненное содержимое с диска."""
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(key)
+        try:
+            content = path.read_bytes()
+            path.touch()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            LOGGER.exception('Не удалось прочитать вытесненный файл %s с диска', key[0])
+            return None
+        return content
+
+    def _store(self: 'ContentCache', key: Key, content: bytes) -> list[tuple[Key, bytes]]:
+        """Добавляет содержимое в память и возвращает вытесненные записи."""
+        for cached_key in [cached_key for cached_key in self._entries if cached_key[0] == key[0]]:
+            self._size -= len(self._entries.pop(cached_key))
+
+        evicted = []
+        if len(content) > self.max_bytes:
+            evicted.append((key, content))
+            return evicted
+
+        self._entries[key] = content
+        self._size += len(content)
+        while self._size > self.max_bytes:
+            evicted_key, evicted_content = self._entries.popitem(last=False)
+            self._size -= len(evicted_content)
+            self._stats['evictions'] += 1
+            evicted.append((evicted_key, evicted_content))
+        return evicted
+
+    def get(self: 'ContentCache', key: Key) -> bytes | None:
+        """Возвращает содержимое файла заданной версии или None, если его нет в кэше."""
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+        if content is not None:
+            count_cache('content', hit=True)
+            return content
+
+        content = self._read_spilled(key)
+        with self._lock:
+            if content is None:
+                self._stats['misses'] += 1
+                evicted = []
+            else:
+                self._stats['disk_hits'] += 1
+                evicted = self._store(key, content)
+        count_cache('content', hit=content is not None)
+        for evicted_key, evicted_content in evicted:
+            if evicted_key != key:
+                self._spill(evicted_key, evicted_content)
+        return content
+
+    def put(self: 'ContentCache', key: Key, content: bytes) -> None:
+        """Сохраняет содержимое файла, заменяя другие версии того же файла."""
+        with self._lock:
+            evicted = self._store(key, content)
+        for evicted_key, evicted_content in evicted:
+            self._spill(evicted_key, evicted_content)
+
+    def stats(self: 'ContentCache') -> dict[str, int]:
+        """Возвращает счетчики обращений и текущий объем кэша."""
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries), 'bytes': self._size}
+
+    def clear(self: 'ContentCache') -> None:
+        """Очищает кэш в памяти."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_CACHES: dict[tuple[int, Path | None, int | None], ContentCache] = {}
+
+_CACHES_LOCK = threading.Lock()
+
+
+def get_content_cache(
+    max_bytes: int, spill_dir: Path | None = None, spill_max_bytes: int | None = None,
+) -> ContentCache:
+    """Возвращает кэш содержимого с заданными параметрами, общий для процесса."""
+    key = (max_bytes, Path(spill_dir) if spill_dir else None, spill_max_bytes)
+    with _CACHES_LOCK:
+        if key not in _CACHES:
+            _CACHES[key] = ContentCache(*key)
+        return _CACHES[key]
+
+
+def clear_content_caches() -> None:
+    """Очищает в памяти все кэши содержимого процесса."""
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+    for content_cache in caches:
+        content_cache.clear()
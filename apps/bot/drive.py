@@ -0,0 +1,183 @@
+"""Модуль доступа к клиенту Google Drive, общему для всего процесса."""
+
+import hashlib
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httplib2
+from django.conf import settings
+from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from apps.bot.metrics import increment, timed
+
+_FIELDS = 'nextPageToken, files(id, name, modifiedTime, md5Checksum)'
+
+_PAGE_SIZE = 1000
+
+_SCOPES = ['https://www.googleapis.com/auth/drive']
+
+_LOCK = threading.Lock()
+
+_LOCAL = threading.local()
+
+_STATE: dict[str, Any] = {'credentials': None}
+
+_CHECKSUMS: dict[Path, tuple[int, int, str]] = {}
+
+
+class _LocalRequest:
+    """Запрос к локальной папке, выполняемый так же, как запрос googleapiclient."""
+
+    def __init__(
+        self: '_LocalRequest', drive: 'LocalFolderDrive', result: Callable[[], Any],
+    ) -> None:
+        """Сохраняет заменитель Google Drive и функцию, вычисляющую результат запроса."""
+        self._drive = drive
+        self._result = result
+
+    def execute(self: '_LocalRequest') -> Any:
+        """Выполняет запрос с заданными задержкой и вероятностью ошибки."""
+        if self._drive.latency:
+            time.sleep(self._drive.latency)
+        if self._drive.error_rate and random.random() < self._drive.error_rate:  # noqa: S311
+            raise HttpError(httplib2.Response({'status': 503}), b'Injected error')
+        return self._result()
+
+
+class LocalFolderDrive:
+    """Заменитель Google Drive, отдающий xlsx файлы из локальной папки.
+
+    Поддерживает только files().list и files().get_media; идентификатором файла служит
+    его имя. Для нагрузочного тестирования каждый запрос можно задержать на latency
+    секунд и завершить ошибкой 503 с вероятностью error_rate.
+    """
+
+    def __init__(
+        self: 'LocalFolderDrive', root: Path, latency: float = 0, error_rate: float = 0,
+    ) -> None:
+        """Создает заменитель для заданной папки."""
+        self.root = Path(root)
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def files(self: 'LocalFolderDrive') -> 'LocalFolderDrive':
+        """Возвращает коллекцию файлов."""
+        return self
+
+    def list(self: 'LocalFolderDrive', **params: Any) -> _LocalRequest:
+        """Возвращает запрос страницы списка файлов папки."""
+        return _LocalRequest(self, lambda: self._list_page(params))
+
+    def get_media(self: 'LocalFolderDrive', **params: Any) -> _LocalRequest:
+        """Возвращает запрос содержимого файла."""
+        return _LocalRequest(self, (self.root / params['fileId']).read_bytes)
+
+    def _list_page(self: 'LocalFolderDrive', params: dict[str, Any]) -> dict[str, Any]:
+        """Возвращает страницу списка файлов папки."""
+        paths = sorted(path for path in self.root.iterdir() if path.suffix == '.xlsx')
+        offset = int(params.get('pageToken') or 0)
+        page_size = params.get('pageSize') or len(paths)
+        page = paths[offset:offset + page_size]
+
+        result: dict[str, Any] = {'files': [self._describe(path) for path in page]}
+        if offset + page_size < len(paths):
+            result['nextPageToken'] = str(offset + page_size)
+        return result
+
+    @staticmethod
+    def _checksum(path: Path, stat: os.stat_result) -> str:
+        """Возвращает md5 файла, пересчитывая его только после изменения файла."""
+        cached = _CHECKSUMS.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        checksum = hashlib.md5(path.read_bytes(), usedforsecurity=False).hexdigest()
+        _CHECKSUMS[path] = (stat.st_mtime_ns, stat.st_size, checksum)
+        return checksum
+
+    @staticmethod
+    def _describe(path: Path) -> dict:
+        """Описывает файл так же, как это делает Google Drive API."""
+        stat = path.stat()
+        modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        return {
+            'id': path.name,
+            'name': path.name,
+            'modifiedTime': modified.isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            'md5Checksum': LocalFolderDrive._checksum(path, stat),
+        }
+
+
+def get_credentials() -> Credentials:
+    """Возвращает учетные данные службы, читая файл учетной записи один раз за процесс."""
+    with _LOCK:
+        if _STATE['credentials'] is None:
+            service_account_file = (
+                settings.BASE_DIR / 'apps' / 'bot' / 'data' / settings.API_ACCOUNT
+            )
+            _STATE['credentials'] = Credentials.from_service_account_file(
+                service_account_file,
+                scopes=_SCOPES,
+            )
+        return _STATE['credentials']
+
+
+def get_drive_service() -> Any:
+    """Возвращает клиент Google Drive.
+
+    Учетные данные общие для процесса и обновляют токен автоматически, а клиент с
+    keep-alive соединением создается один раз на поток, так как httplib2 не потокобезопасен.
+    Если задана настройка SCHEDULE_LOCAL_FOLDER, вместо Google Drive используется локальная
+    папка.
+    """
+    if settings.SCHEDULE_LOCAL_FOLDER:
+        return LocalFolderDrive(
+            settings.SCHEDULE_LOCAL_FOLDER,
+            latency=settings.SCHEDULE_LOCAL_FOLDER_LATENCY,
+            error_rate=settings.SCHEDULE_LOCAL_FOLDER_ERROR_RATE,
+        )
+
+    cached = getattr(_LOCAL, 'service', None)
+    if cached is not None:
+        return cached
+
+    with timed('drive_build'):
+        http = AuthorizedHttp(
+            get_credentials(),
+            http=httplib2.Http(timeout=settings.SCHEDULE_DRIVE_TIMEOUT),
+        )
+        drive_service = build('drive', 'v3', http=http, cache_discovery=False)
+    _LOCAL.service = drive_service
+    return drive_service
+
+
+def list_files(folder_id: str) -> list[dict]:
+    """Получает полный список файлов папки, проходя по всем страницам."""
+    drive_service = get_drive_service()
+    files = []
+    page_token = None
+
+    while True:
+        results = (
+            drive_service.files()
+            .list(
+                q=f"'{folder_id}' in parents",
+                fields=_FIELDS,
+                pageSize=_PAGE_SIZE,
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        increment('schedule_drive_calls_total', method='list')
+        files.extend(results.get('files', []))
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return files
@@ -0,0 +1,114 @@
+"""Модуль импорта занятий из Excel файлов расписания в базу данных."""
+
+from io import BytesIO
+
+from django.db import transaction
+
+from apps.bot.changes import lesson_key, record_changes
+from apps.bot.models import Educator, Lesson, ScheduleFile, ScheduleSheet
+from apps.bot.schedule_index import (
+    extract_lessons,
+    format_cell,
+    normalize_surname,
+    pair_number,
+    surname_key,
+)
+
+_BATCH_SIZE = 1000
+
+
+def _educators_by_last_name() -> dict[str, Educator]:
+    """Возвращает преподавателей по фамилии в нижнем регистре, пропуская однофамильцев."""
+    educators: dict[str, Educator | None] = {}
+    for educator in Educator.objects.all():
+        key = normalize_surname(educator.last_name)
+        educators[key] = None if key in educators else educator
+    return {key: educator for key, educator in educators.items() if educator is not None}
+
+
+def is_imported(file: dict) -> bool:
+    """Проверяет, импортирована ли текущая версия файла."""
+    return ScheduleFile.objects.filter(
+        drive_id=file['id'], modified_time=file.get('modifiedTime', ''),
+    ).exists()
+
+
+def _previous_import(file: dict) -> ScheduleFile | None:
+    """Возвращает ранее импортированную версию файла.
+
+    Файл, заново загруженный на Google Drive, получает новый идентификатор, поэтому
+    при отсутствии файла с тем же идентификатором ищется последний импорт с тем же именем.
+    """
+    previous = ScheduleFile.objects.filter(drive_id=file['id']).first()
+    if previous is None:
+        previous = (
+            ScheduleFile.objects.filter(name=file['name']).order_by('-imported_at').first()
+        )
+    return previous
+
+
+@transaction.atomic
+def import_schedule(file: dict, file_content: BytesIO) -> ScheduleFile:
+    """Импортирует занятия файла расписания, заменяя ранее импортированную версию файла.
+
+    Если ранее была импортирована другая версия файла, изменения занятий групп и
+    преподавателей между версиями сохраняются в ScheduleChange. Заново загруженный
+    файл с тем же именем заменяет прежний импорт вместе с историей его изменений,
+    остальные импорты с этим именем удаляются.
+    """
+    previous = _previous_import(file)
+    old_lessons = []
+    previous_version = None
+    if previous is not None:
+        previous_version = previous.modified_time
+        old_lessons = [
+            lesson_key(lesson)
+            for lesson in Lesson.objects.filter(
+                sheet__schedule_file=previous,
+            ).select_related('sheet')
+        ]
+
+    schedule_file = previous or ScheduleFile()
+    ScheduleFile.objects.filter(name=file['name']).exclude(pk=schedule_file.pk).delete()
+    schedule_file.drive_id = file['id']
+    schedule_file.name = file['name']
+    schedule_file.modified_time = file.get('modifiedTime', '')
+    schedule_file.save()
+    schedule_file.sheets.all().delete()
+
+    educators = _educators_by_last_name()
+    sheets: dict[str, ScheduleSheet] = {}
+    lessons = []
+
+    for lesson in extract_lessons(file_content):
+        schedule_sheet = sheets.get(lesson.sheet_title)
+        if schedule_sheet is None:
+            schedule_sheet = ScheduleSheet.objects.create(
+                schedule_file=schedule_file, title=lesson.sheet_title, position=len(sheets),
+            )
+            sheets[lesson.sheet_title] = schedule_sheet
+
+        teacher = None
+        if isinstance(lesson.teacher, str):
+            teacher = educators.get(surname_key(lesson.teacher))
+
+        lessons.append(Lesson(
+            sheet=schedule_sheet,
+            position=lesson.position,
+            pair_number=pair_number(lesson.sheet_title),
+            room=format_cell(lesson.room),
+            group=format_cell(lesson.group),
+            teacher_name=format_cell(lesson.teacher),
+            teacher=teacher,
+            class_hour=lesson.class_hour,
+        ))
+
+    Lesson.objects.bulk_create(lessons, batch_size=_BATCH_SIZE)
+    if previous_version is not None and previous_version != schedule_file.modified_time:
+        record_changes(
+            schedule_file,
+            previous_version,
+            old_lessons,
+            [lesson_key(lesson) for lesson in lessons],
+        )
+    return schedule_file
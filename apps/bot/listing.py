@@ -0,0 +1,47 @@
+"""Модуль кэширования списка файлов папки с расписаниями."""
+
+import threading
+import time
+from collections.abc import Callable
+
+
+class FolderListing:
+    """Список файлов папки, обновляемый не чаще одного раза за время жизни кэша."""
+
+    def __init__(
+        self: 'FolderListing',
+        fetch: Callable[[], list[dict]],
+        ttl: Callable[[], float],
+    ) -> None:
+        """Создает кэш с функцией получения файлов и функцией, возвращающей время жизни."""
+        self._fetch = fetch
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._files: list[dict] = []
+        self._by_name: dict[str, dict] = {}
+        self._expires_at = 0.0
+
+    def _refresh(self: 'FolderListing') -> None:
+        """Перечитывает список файлов, если срок жизни кэша истек."""
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return
+            files = self._fetch()
+            self._files = files
+            self._by_name = {file['name']: file for file in files}
+            self._expires_at = time.monotonic() + self._ttl()
+
+    def files(self: 'FolderListing') -> list[dict]:
+        """Возвращает список файлов папки."""
+        self._refresh()
+        return list(self._files)
+
+    def get(self: 'FolderListing', name: str) -> dict | None:
+        """Возвращает файл по его имени или None, если файла нет."""
+        self._refresh()
+        return self._by_name.get(name)
+
+    def invalidate(self: 'FolderListing') -> None:
+        """Сбрасывает кэш, чтобы следующее обращение перечитало папку."""
+        with self._lock:
+            self._expires_at = 0.0
@@ -0,0 +1,104 @@
+"""Модуль нагрузочного тестирования представлений расписания."""
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import urlencode
+
+from django.test import Client
+
+from apps.bot.benchmarks import percentile
+
+ENDPOINTS = {
+    'service': '/api/service/',
+    'teachers': '/api/teachers/',
+    'async-service': '/api/async/service/',
+    'async-teachers': '/api/async/teachers/',
+}
+
+Sender = Callable[[str, dict[str, str]], int]
+
+
+def client_sender() -> Sender:
+    """Возвращает отправителя запросов через тестовый клиент Django в этом же процессе."""
+    local = threading.local()
+
+    def send(path: str, params: dict[str, str]) -> int:
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        return local.client.get(path, params).status_code
+
+    return send
+
+
+def http_sender(base_url: str, timeout: float) -> Sender:
+    """Возвращает отправителя HTTP запросов к запущенному серверу."""
+
+    def send(path: str, params: dict[str, str]) -> int:
+        url = f'{base_url.rstrip("/")}{path}?{urlencode(params)}'
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:  # noqa: S310
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+        except (urllib.error.URLError, TimeoutError):
+            return 0
+
+    return send
+
+
+def run_load(
+    send: Sender,
+    requests: list[tuple[str, dict[str, str]]],
+    concurrency: int,
+) -> dict[str, Any]:
+    """Выполняет запросы в concurrency потоков и возвращает отчет по каждому представлению.
+
+    requests - пары путь, параметры; статус 0 означает, что ответ не получен.
+    """
+    results: list[tuple[str, float, int]] = []
+    lock = threading.Lock()
+
+    def call(path: str, params: dict[str, str]) -> None:
+        started = time.perf_counter()
+        status_code = send(path, params)
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            results.append((path, elapsed, status_code))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(call, path, params) for path, params in requests]:
+            future.result()
+    duration = time.perf_counter() - started
+
+    endpoints = {}
+    for path in dict.fromkeys(path for path, _, _ in results):
+        samples = [elapsed for result_path, elapsed, _ in results if result_path == path]
+        statuses = Counter(
+            status_code for result_path, _, status_code in results if result_path == path
+        )
+        endpoints[path] = {
+            'requests': len(samples),
+            'errors': sum(count for code, count in statuses.items() if not 200 <= code < 400),  # noqa: PLR2004
+            'statuses': {str(code): count for code, count in sorted(statuses.items())},
+            'throughput_rps': round(len(samples) / duration, 1),
+            'p50_ms': round(percentile(samples, 50), 3),
+            'p90_ms': round(percentile(samples, 90), 3),
+            'p99_ms': round(percentile(samples, 99), 3),
+            'max_ms': round(max(samples), 3),
+        }
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(results),
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(results) / duration, 1),
+        'endpoints': endpoints,
+    }
@@ -0,0 +1,53 @@
+"""Команда замеров производительности обработки расписаний."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.bot.benchmarks import PROFILES, run_benchmarks
+
+
+class Command(BaseCommand):
+    """Замеряет разбор, форматирование и запросы расписания на синтетических файлах."""
+
+    help = 'Выполняет замеры производительности и выводит отчет в формате JSON.'
+
+    def add_arguments(self: 'Command', parser: CommandParser) -> None:
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--profile',
+            choices=sorted(PROFILES),
+            action='append',
+            help='Размер синтетического файла; можно указать несколько раз.',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Количество повторов каждого этапа обработки.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество запросов к каждому представлению.',
+        )
+        parser.add_argument('--label', help='Метка отчета, например хеш коммита.')
+        parser.add_argument('--output', type=Path, help='Файл для отчета вместо вывода.')
+
+    def handle(self: 'Command', *_args: Any, **options: Any) -> None:
+        """Выполняет замеры для выбранных профилей и сохраняет отчет."""
+        report = {
+            'label': options['label'],
+            'results': [
+                run_benchmarks(profile, options['iterations'], options['requests'])
+                for profile in options['profile'] or ['realistic']
+            ],
+        }
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            options['output'].write_text(data + '\n', encoding='utf-8')
+        else:
+            self.stdout.write(data)
@@ -0,0 +1,30 @@
+"""Команда импорта файлов расписания в базу данных."""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.bot.importer import import_schedule, is_imported
+from apps.bot.utils import get_filenames, load_file_content
+
+
+class Command(BaseCommand):
+    """Импортирует занятия из новых и измененных файлов расписания."""
+
+    help = 'Импортирует занятия из файлов расписания в базу данных.'
+
+    def add_arguments(self: 'Command', parser: CommandParser) -> None:
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Импортировать файлы заново, даже если их версия уже импортирована.',
+        )
+
+    def handle(self: 'Command', *_args: Any, **options: Any) -> None:
+        """Импортирует файлы, версия которых еще не сохранена в базе данных."""
+        for file in get_filenames():
+            if not options['force'] and is_imported(file):
+                continue
+            schedule_file = import_schedule(file, load_file_content(file))
+            self.stdout.write(f'Импортирован файл {schedule_file.name}')
@@ -0,0 +1,110 @@
+"""Команда нагрузочного тестирования представлений расписания."""
+
+import json
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.test import override_settings
+
+from apps.bot.benchmarks import isolated_caches, reset_caches
+from apps.bot.loadtest import ENDPOINTS, client_sender, http_sender, run_load
+from apps.bot.utils import find_file, get_schedule_index, teacher_query
+
+
+class Command(BaseCommand):
+    """Отправляет конкурентные запросы к представлениям и замеряет пропускную способность."""
+
+    help = (
+        'Выполняет нагрузочный тест представлений расписания и выводит отчет в формате JSON. '
+        'Без --base-url запросы выполняются в этом же процессе через тестовый клиент Django.'
+    )
+
+    def add_arguments(self: 'Command', parser: CommandParser) -> None:
+        """Добавляет аргументы команды."""
+        parser.add_argument('--date', required=True, help='Дата файла расписания.')
+        parser.add_argument(
+            '--endpoint',
+            choices=sorted(ENDPOINTS),
+            action='append',
+            help='Представление; можно указать несколько раз. По умолчанию service и teachers.',
+        )
+        parser.add_argument(
+            '--group',
+            action='append',
+            help='Группа для запросов; по умолчанию все группы файла.',
+        )
+        parser.add_argument(
+            '--teacher',
+            action='append',
+            help='Преподаватель для запросов; по умолчанию все преподаватели файла.',
+        )
+        parser.add_argument('--requests', type=int, default=1000, help='Всего запросов.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Число потоков.')
+        parser.add_argument('--base-url', help='Адрес запущенного сервера.')
+        parser.add_argument(
+            '--timeout', type=float, default=30, help='Время ожидания ответа сервера в секундах.',
+        )
+        parser.add_argument(
+            '--folder',
+            type=Path,
+            help='Папка с xlsx файлами вместо Google Drive (только без --base-url).',
+        )
+        parser.add_argument('--output', type=Path, help='Файл для отчета вместо вывода.')
+
+    def handle(self: 'Command', *_args: Any, **options: Any) -> None:
+        """Выполняет нагрузочный тест и сохраняет отчет."""
+        overrides: dict[str, Any] = {}
+        if options['folder']:
+            if options['base_url']:
+                msg = '--folder используется только без --base-url.'
+                raise CommandError(msg)
+            overrides['SCHEDULE_LOCAL_FOLDER'] = options['folder']
+        if not options['base_url']:
+            overrides['ALLOWED_HOSTS'] = [*settings.ALLOWED_HOSTS, 'testserver']
+
+        with override_settings(**overrides), ExitStack() as stack:
+            if not options['base_url']:
+                stack.enter_context(isolated_caches())
+            with override_settings(SCHEDULE_LOCAL_FOLDER_ERROR_RATE=0):
+                requests = self._requests(options)
+            if options['base_url']:
+                send = http_sender(options['base_url'], options['timeout'])
+            else:
+                reset_caches()
+                send = client_sender()
+            report = run_load(send, requests, options['concurrency'])
+
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            options['output'].write_text(data + '\n', encoding='utf-8')
+        else:
+            self.stdout.write(data)
+
+    @staticmethod
+    def _requests(options: dict[str, Any]) -> list[tuple[str, dict[str, str]]]:
+        """Составляет список запросов, чередуя представления и группы или преподавателей.
+
+        Группы и преподаватели, не заданные в параметрах, берутся из файла расписания без
+        внесения ошибок заменителем Google Drive.
+        """
+        groups, teachers = options['group'], options['teacher']
+        if not groups or not teachers:
+            file = find_file(options['date'])
+            if file is None:
+                msg = f'Файл расписания на {options["date"]} не найден.'
+                raise CommandError(msg)
+            index = get_schedule_index(file)
+            groups = groups or list(index.groups)
+            teachers = teachers or [teacher_query(surname) for surname in index.teachers]
+
+        endpoints = [ENDPOINTS[name] for name in options['endpoint'] or ['service', 'teachers']]
+        requests = []
+        for number in range(options['requests']):
+            path = endpoints[number % len(endpoints)]
+            queries = teachers if 'teachers' in path else groups
+            query = queries[number // len(endpoints) % len(queries)]
+            requests.append((path, {'date': options['date'], 'group': query}))
+        return requests
@@ -0,0 +1,49 @@
+"""Команда предварительной подготовки расписаний на ближайшие дни."""
+
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from apps.bot.caching import is_cache_shared
+from apps.bot.utils import prewarm_schedules
+
+
+class Command(BaseCommand):
+    """Скачивает и разбирает файлы расписания на сегодня и последующие дни."""
+
+    help = 'Заранее готовит расписания на ближайшие дни, чтобы первые запросы были быстрыми.'
+
+    def add_arguments(self: 'Command', parser: CommandParser) -> None:
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--render',
+            action='store_true',
+            help=(
+                'Сохранить в кэш ответов тексты расписаний всех групп и преподавателей; '
+                'требует общего для процессов кэша (CACHE_BACKEND, например Redis).'
+            ),
+        )
+
+    def handle(self: 'Command', *_args: Any, **options: Any) -> None:
+        """Подготавливает файлы и выводит их имена.
+
+        Результат подготовки переживает команду только в виде снимков индексов в
+        локальном зеркале или текстов в общем кэше ответов; без них команда не запускается.
+        """
+        render = options['render']
+        if render and not is_cache_shared():
+            self.stderr.write(self.style.WARNING(
+                'Кэш ответов хранится в памяти процесса и не виден серверу, тексты '
+                'расписаний не сохраняются. Задайте общий CACHE_BACKEND.',
+            ))
+            render = False
+        if not render and not settings.SCHEDULE_USE_MIRROR:
+            msg = (
+                'Подготовленные расписания не сохранятся: включите локальное зеркало '
+                '(SCHEDULE_USE_MIRROR) или задайте общий CACHE_BACKEND и --render.'
+            )
+            raise CommandError(msg)
+
+        for file in prewarm_schedules(render=render):
+            self.stdout.write(f'Подготовлен файл {file["name"]}')
@@ -0,0 +1,123 @@
+"""Команда синхронизации локального зеркала расписаний с Google Drive."""
+
+import logging
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from apps.bot.caching import is_cache_shared
+from apps.bot.importer import import_schedule, is_imported
+from apps.bot.mirror import get_mirror
+from apps.bot.utils import load_file_content, prewarm_schedules, sync_mirror
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Скачивает новые и измененные файлы расписания в локальное зеркало."""
+
+    help = 'Синхронизирует локальное зеркало расписаний с папкой на Google Drive.'
+
+    def add_arguments(self: 'Command', parser: CommandParser) -> None:
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Интервал опроса в секундах; без него синхронизация выполняется один раз.',
+        )
+        parser.add_argument(
+            '--prewarm',
+            action='store_true',
+            help=(
+                'После синхронизации подготовить расписания на сегодня и последующие '
+                'дни. Тексты расписаний сохраняются в кэш ответов, только если он общий '
+                'для процессов (CACHE_BACKEND, например Redis).'
+            ),
+        )
+
+        parser.add_argument(
+            '--import',
+            action='store_true',
+            dest='import_files',
+            help=(
+                'Импортировать в базу данных файлы зеркала, версия которых еще не '
+                'импортирована, сохраняя изменения расписания групп и преподавателей.'
+            ),
+        )
+
+    @staticmethod
+    def _import_lagging() -> tuple[list[dict], list[dict]]:
+        """Импортирует файлы зеркала, версия которых еще не сохранена в базе данных.
+
+        Возвращает импортированные файлы и файлы, импорт которых завершился ошибкой.
+        Ошибка в одном файле не прерывает импорт остальных, а сам файл остается
+        неимпортированным и повторяется при следующей синхронизации.
+        """
+        imported, failed = [], []
+        for file in get_mirror(settings.SCHEDULE_MIRROR_DIR).files():
+            if is_imported(file):
+                continue
+            try:
+                import_schedule(file, load_file_content(file))
+            except Exception:
+                LOGGER.exception('Ошибка импорта файла %s', file['name'])
+                failed.append(file)
+            else:
+                imported.append(file)
+        return imported, failed
+
+    def _can_render(self: 'Command') -> bool:
+        """Проверяет, увидит ли сервер тексты, сохраненные командой в кэш ответов."""
+        if is_cache_shared():
+            return True
+        self.stderr.write(self.style.WARNING(
+            'Кэш ответов хранится в памяти процесса и не виден серверу, тексты '
+            'расписаний не сохраняются. Задайте общий CACHE_BACKEND.',
+        ))
+        return False
+
+    def _report(
+        self: 'Command',
+        changed: list[dict],
+        imported: list[dict],
+        warmed: list[dict],
+        failed: list[dict],
+    ) -> None:
+        """Выводит результаты одного прохода синхронизации."""
+        for file in changed:
+            self.stdout.write(f'Обновлен файл {file["name"]}')
+        for file in imported:
+            self.stdout.write(f'Импортирован файл {file["name"]}')
+        for file in warmed:
+            self.stdout.write(f'Подготовлен файл {file["name"]}')
+        for file in failed:
+            self.stderr.write(f'Ошибка импорта файла {file["name"]}')
+
+    def handle(self: 'Command', *_args: Any, **options: Any) -> None:
+        """Выполняет синхронизацию один раз или периодически."""
+        interval = options['interval']
+        render = options['prewarm'] and self._can_render()
+
+        while True:
+            imported, failed = [], []
+            try:
+                changed = sync_mirror()
+                if options['import_files']:
+                    imported, failed = self._import_lagging()
+                warmed = prewarm_schedules(render=render) if options['prewarm'] and changed else []
+            except Exception:
+                if not interval:
+                    raise
+                LOGGER.exception('Ошибка синхронизации зеркала расписаний')
+            else:
+                self._report(changed, imported, warmed, failed)
+
+            if not interval:
+                if failed:
+                    msg = f'Не удалось импортировать файлов: {len(failed)}'
+                    raise CommandError(msg)
+                return
+            time.sleep(interval)
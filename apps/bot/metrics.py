@@ -0,0 +1,141 @@
+"""Модуль счетчиков и гистограмм времени выполнения для обработки расписаний.
+
+Метрики хранятся в памяти процесса и отдаются в текстовом формате Prometheus; при
+нескольких процессах сервера каждый из них ведет собственные значения.
+"""
+
+import bisect
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_METRICS = {
+    'schedule_stage_duration_seconds': ('histogram', 'Время выполнения этапов обработки.'),
+    'schedule_request_duration_seconds': ('histogram', 'Время обработки HTTP запросов.'),
+    'schedule_slow_requests_total': ('counter', 'Количество медленных HTTP запросов.'),
+    'schedule_cache_requests_total': ('counter', 'Обращения к кэшам расписания.'),
+    'schedule_drive_calls_total': ('counter', 'Вызовы Google Drive API.'),
+    'schedule_drive_downloaded_bytes_total': ('counter', 'Байты, скачанные с Google Drive.'),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class _Histogram:
+    """Гистограмма наблюдений с фиксированными границами корзин."""
+
+    def __init__(self: '_Histogram') -> None:
+        """Создает пустую гистограмму."""
+        self.buckets = [0] * (len(_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self: '_Histogram', value: float) -> None:
+        """Добавляет наблюдение."""
+        self.buckets[bisect.bisect_left(_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels: Labels, extra: str = '') -> str:
+    """Форматирует метки в виде {name="value",...}."""
+    parts = [f'{name}="{value}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class MetricsRegistry:
+    """Потокобезопасное хранилище счетчиков и гистограмм."""
+
+    def __init__(self: 'MetricsRegistry') -> None:
+        """Создает пустое хранилище."""
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], _Histogram] = {}
+
+    def increment(self: 'MetricsRegistry', name: str, amount: float = 1, **labels: str) -> None:
+        """Увеличивает счетчик с заданными метками."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self: 'MetricsRegistry', name: str, value: float, **labels: str) -> None:
+        """Добавляет наблюдение в гистограмму с заданными метками."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._histograms.setdefault(key, _Histogram()).observe(value)
+
+    def value(self: 'MetricsRegistry', name: str, **labels: str) -> float:
+        """Возвращает значение счетчика или количество наблюдений гистограммы."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key in self._histograms:
+                return self._histograms[key].count
+            return self._counters.get(key, 0)
+
+    def reset(self: 'MetricsRegistry') -> None:
+        """Обнуляет все метрики."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self: 'MetricsRegistry') -> str:
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        lines = []
+        with self._lock:
+            for name, (kind, description) in _METRICS.items():
+                lines.extend((f'# HELP {name} {description}', f'# TYPE {name} {kind}'))
+                if kind == 'counter':
+                    lines.extend(
+                        f'{name}{_format_labels(labels)} {value:g}'
+                        for (metric, labels), value in sorted(self._counters.items())
+                        if metric == name
+                    )
+                    continue
+                for (metric, labels), histogram in sorted(
+                    self._histograms.items(), key=lambda item: item[0],
+                ):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*_BUCKETS, '+Inf'), histogram.buckets, strict=True):
+                        cumulative += count
+                        le = f'le="{bound}"'
+                        lines.append(f'{name}_bucket{_format_labels(labels, le)} {cumulative}')
+                    lines.extend((
+                        f'{name}_sum{_format_labels(labels)} {histogram.sum:g}',
+                        f'{name}_count{_format_labels(labels)} {histogram.count}',
+                    ))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def increment(name: str, amount: float = 1, **labels: str) -> None:
+    """Увеличивает счетчик общего хранилища метрик."""
+    REGISTRY.increment(name, amount, **labels)
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    """Добавляет наблюдение в гистограмму общего хранилища метрик."""
+    REGISTRY.observe(name, value, **labels)
+
+
+def count_cache(cache: str, *, hit: bool) -> None:
+    """Учитывает попадание или промах кэша расписания."""
+    increment('schedule_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Замеряет время выполнения этапа; работает и как менеджер контекста, и как декоратор."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe('schedule_stage_duration_seconds', time.perf_counter() - started, stage=stage)
@@ -0,0 +1,67 @@
+"""Промежуточные обработчики приложения bot."""
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponseBase
+
+from apps.bot.metrics import increment, observe
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """Замеряет время обработки запросов и записывает в журнал медленные запросы.
+
+    Поддерживает синхронные и асинхронные представления, не переводя асинхронные
+    представления в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(
+        self: 'MetricsMiddleware',
+        get_response: Callable[[HttpRequest], HttpResponseBase | Awaitable[HttpResponseBase]],
+    ) -> None:
+        """Сохраняет следующий обработчик цепочки."""
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self: 'MetricsMiddleware', request: HttpRequest) -> HttpResponseBase:
+        """Обрабатывает запрос, замеряя время его выполнения."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self: 'MetricsMiddleware', request: HttpRequest) -> HttpResponseBase:
+        """Асинхронно обрабатывает запрос, замеряя время его выполнения."""
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _record(request: HttpRequest, response: HttpResponseBase, elapsed: float) -> None:
+        """Сохраняет время запроса в метриках и записывает в журнал медленный запрос."""
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unmatched'
+        observe('schedule_request_duration_seconds', elapsed, view=view)
+
+        threshold = settings.SCHEDULE_SLOW_REQUEST_SECONDS
+        if threshold and elapsed >= threshold:
+            increment('schedule_slow_requests_total', view=view)
+            LOGGER.warning(
+                'Медленный запрос %s %s: %.3f с, статус %s',
+                request.method,
+                request.get_full_path(),
+                elapsed,
+                response.status_code,
+            )
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:41
+
+# Таблица Educator создавалась и до появления миграций приложения; на таких базах
+# миграция отмечается примененной командой `manage.py migrate bot --fake-initial`.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Educator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=55, verbose_name='Имя')),
+                ('last_name', models.CharField(max_length=55, verbose_name='Фамилия')),
+                ('middle_name', models.CharField(max_length=55, verbose_name='Отчество')),
+            ],
+        ),
+    ]
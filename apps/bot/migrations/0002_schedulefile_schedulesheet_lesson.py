@@ -0,0 +1,54 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('drive_id', models.CharField(max_length=255, unique=True, verbose_name='Идентификатор файла')),
+                ('name', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('modified_time', models.CharField(max_length=64, verbose_name='Версия файла')),
+                ('imported_at', models.DateTimeField(auto_now=True, verbose_name='Дата импорта')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScheduleSheet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='Название листа')),
+                ('position', models.PositiveSmallIntegerField(verbose_name='Порядковый номер')),
+                ('schedule_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sheets', to='bot.schedulefile', verbose_name='Файл расписания')),
+            ],
+            options={
+                'ordering': ('position',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Lesson',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(verbose_name='Порядковый номер')),
+                ('pair_number', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Номер пары')),
+                ('room', models.CharField(blank=True, max_length=55, verbose_name='Кабинет')),
+                ('group', models.CharField(blank=True, max_length=55, verbose_name='Группа')),
+                ('teacher_name', models.CharField(blank=True, max_length=255, verbose_name='Преподаватель')),
+                ('class_hour', models.BooleanField(default=False, verbose_name='Классный час')),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lessons', to='bot.educator', verbose_name='Преподаватель')),
+                ('sheet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lessons', to='bot.schedulesheet', verbose_name='Лист расписания')),
+            ],
+            options={
+                'ordering': ('position',),
+                'indexes': [models.Index(fields=['group'], name='bot_lesson_group_d3f497_idx'), models.Index(fields=['teacher_name'], name='bot_lesson_teacher_5ba126_idx')],
+            },
+        ),
+    ]
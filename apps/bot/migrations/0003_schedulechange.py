@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0002_schedulefile_schedulesheet_lesson'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=64, verbose_name='Версия файла')),
+                ('previous_version', models.CharField(max_length=64, verbose_name='Предыдущая версия файла')),
+                ('kind', models.CharField(choices=[('group', 'Группа'), ('teacher', 'Преподаватель')], max_length=16, verbose_name='Тип')),
+                ('key', models.CharField(max_length=255, verbose_name='Группа или фамилия преподавателя')),
+                ('added', models.JSONField(default=list, verbose_name='Добавленные занятия')),
+                ('removed', models.JSONField(default=list, verbose_name='Удаленные занятия')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата изменения')),
+                ('schedule_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='bot.schedulefile', verbose_name='Файл расписания')),
+            ],
+            options={
+                'ordering': ('id',),
+                'indexes': [models.Index(fields=['schedule_file', 'version'], name='bot_schedul_schedul_9cdf50_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0003_schedulechange'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='schedulefile',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255, verbose_name='Имя файла'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0004_alter_schedulefile_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lesson',
+            name='group',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Группа'),
+        ),
+        migrations.AlterField(
+            model_name='lesson',
+            name='room',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Кабинет'),
+        ),
+    ]
@@ -0,0 +1,122 @@
+"""Модуль локального зеркала файлов расписания с Google Drive."""
+
+import json
+import os
+import threading
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+
+_MANIFEST_NAME = 'manifest.json'
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Записывает файл целиком, чтобы читатели не увидели его частично записанным."""
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
+
+def _is_changed(file: dict, mirrored: dict | None) -> bool:
+    """Проверяет, отличается ли файл на Google Drive от его копии в зеркале."""
+    if mirrored is None:
+        return True
+    if file.get('md5Checksum') and mirrored.get('md5Checksum'):
+        return file['md5Checksum'] != mirrored['md5Checksum']
+    return file.get('modifiedTime') != mirrored.get('modifiedTime')
+
+
+class ScheduleMirror:
+    """Папка с копиями файлов расписания и манифестом их версий."""
+
+    def __init__(self: 'ScheduleMirror', root: Path) -> None:
+        """Создает зеркало в заданной папке."""
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._manifest: dict[str, dict] = {}
+        self._manifest_stamp: tuple[int, int, int] | None = None
+
+    @property
+    def manifest_path(self: 'ScheduleMirror') -> Path:
+        """Путь к манифесту зеркала."""
+        return self.root / _MANIFEST_NAME
+
+    def path_for(self: 'ScheduleMirror', file_id: str) -> Path:
+        """Путь к копии файла в зеркале."""
+        return self.root / f'{file_id}.xlsx'
+
+    def snapshot_path_for(self: 'ScheduleMirror', file_id: str) -> Path:
+        """Путь к снимку индекса файла в зеркале."""
+        return self.root / f'{file_id}.idx'
+
+    def manifest(self: 'ScheduleMirror') -> dict[str, dict]:
+        """Возвращает манифест, перечитывая его только после изменения на диске."""
+        try:
+            stat = self.manifest_path.stat()
+        except FileNotFoundError:
+            return {}
+
+        stamp = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+        with self._lock:
+            if stamp != self._manifest_stamp:
+                self._manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+                self._manifest_stamp = stamp
+            return self._manifest
+
+    def files(self: 'ScheduleMirror') -> list[dict]:
+        """Возвращает описания файлов, находящихся в зеркале."""
+        return list(self.manifest().values())
+
+    def read(self: 'ScheduleMirror', file: dict) -> BytesIO | None:
+        """Возвращает содержимое файла, если в зеркале лежит та же его версия."""
+        mirrored = self.manifest().get(file['id'])
+        if mirrored is None or _is_changed(file, mirrored):
+            return None
+        try:
+            return BytesIO(self.path_for(file['id']).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def sync(
+        self: 'ScheduleMirror',
+        files: list[dict],
+        download: Callable[[str], bytes],
+    ) -> list[dict]:
+        """Приводит зеркало в соответствие со списком файлов.
+
+        Скачиваются только новые и измененные файлы, удаленные из папки файлы удаляются
+        из зеркала. Возвращает список скачанных файлов.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        old_manifest = self.manifest()
+        new_manifest = {}
+        changed = []
+
+        for file in files:
+            if _is_changed(file, old_manifest.get(file['id'])):
+                write_atomic(self.path_for(file['id']), download(file['id']))
+                self.snapshot_path_for(file['id']).unlink(missing_ok=True)
+                changed.append(file)
+            new_manifest[file['id']] = file
+
+        write_atomic(
+            self.manifest_path,
+            json.dumps(new_manifest, ensure_ascii=False, indent=2).encode(),
+        )
+
+        for file_id in old_manifest.keys() - new_manifest.keys():
+            self.path_for(file_id).unlink(missing_ok=True)
+            self.snapshot_path_for(file_id).unlink(missing_ok=True)
+
+        return changed
+
+
+_MIRRORS: dict[Path, ScheduleMirror] = {}
+
+
+def get_mirror(root: Path) -> ScheduleMirror:
+    """Возвращает зеркало для заданной папки, общее для процесса."""
+    root = Path(root)
+    if root not in _MIRRORS:
+        _MIRRORS[root] = ScheduleMirror(root)
+    return _MIRRORS[root]
@@ -14,3 +14,114 @@ class Educator(models.Model):
         """Возвращает значение ФИО преподавателя."""
         return f'{self.last_name} {self.first_name} {self.middle_name}'
 
+
+class ScheduleFile(models.Model):
+    """Модель описывающая файл расписания на один день."""
+
+    drive_id = models.CharField(max_length=255, unique=True, verbose_name='Идентификатор файла')
+    name = models.CharField(max_length=255, db_index=True, verbose_name='Имя файла')
+    modified_time = models.CharField(max_length=64, verbose_name='Версия файла')
+    imported_at = models.DateTimeField(auto_now=True, verbose_name='Дата импорта')
+
+    def __str__(self: 'ScheduleFile') -> str:
+        """Возвращает имя файла расписания."""
+        return self.name
+
+
+class ScheduleSheet(models.Model):
+    """Модель описывающая лист файла расписания."""
+
+    schedule_file = models.ForeignKey(
+        ScheduleFile,
+        on_delete=models.CASCADE,
+        related_name='sheets',
+        verbose_name='Файл расписания',
+    )
+    title = models.CharField(max_length=255, verbose_name='Название листа')
+    position = models.PositiveSmallIntegerField(verbose_name='Порядковый номер')
+
+    class Meta:
+        """Метаданные модели листа расписания."""
+
+        ordering = ('position',)
+
+    def __str__(self: 'ScheduleSheet') -> str:
+        """Возвращает название листа."""
+        return self.title
+
+
+class Lesson(models.Model):
+    """Модель описывающая занятие из файла расписания."""
+
+    sheet = models.ForeignKey(
+        ScheduleSheet,
+        on_delete=models.CASCADE,
+        related_name='lessons',
+        verbose_name='Лист расписания',
+    )
+    position = models.PositiveIntegerField(verbose_name='Порядковый номер')
+    pair_number = models.PositiveSmallIntegerField(
+        null=True, blank=True, verbose_name='Номер пары',
+    )
+    room = models.CharField(max_length=255, blank=True, verbose_name='Кабинет')
+    group = models.CharField(max_length=255, blank=True, verbose_name='Группа')
+    teacher_name = models.CharField(max_length=255, blank=True, verbose_name='Преподаватель')
+    teacher = models.ForeignKey(
+        Educator,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='lessons',
+        verbose_name='Преподаватель',
+    )
+    class_hour = models.BooleanField(default=False, verbose_name='Классный час')
+
+    class Meta:
+        """Метаданные модели занятия."""
+
+        ordering = ('position',)
+        indexes = (
+            models.Index(fields=('group',)),
+            models.Index(fields=('teacher_name',)),
+        )
+
+    def __str__(self: 'Lesson') -> str:
+        """Возвращает краткое описание занятия."""
+        return f'{self.sheet.title}: {self.group} {self.teacher_name}'
+
+
+class ScheduleChange(models.Model):
+    """Модель описывающая изменение занятий группы или преподавателя в новой версии файла."""
+
+    GROUP = 'group'
+    TEACHER = 'teacher'
+    KIND_CHOICES = (
+        (GROUP, 'Группа'),
+        (TEACHER, 'Преподаватель'),
+    )
+
+    schedule_file = models.ForeignKey(
+        ScheduleFile,
+        on_delete=models.CASCADE,
+        related_name='changes',
+        verbose_name='Файл расписания',
+    )
+    version = models.CharField(max_length=64, verbose_name='Версия файла')
+    previous_version = models.CharField(max_length=64, verbose_name='Предыдущая версия файла')
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES, verbose_name='Тип')
+    key = models.CharField(max_length=255, verbose_name='Группа или фамилия преподавателя')
+    added = models.JSONField(default=list, verbose_name='Добавленные занятия')
+    removed = models.JSONField(default=list, verbose_name='Удаленные занятия')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата изменения')
+
+    class Meta:
+        """Метаданные модели изменения расписания."""
+
+        ordering = ('id',)
+        indexes = (
+            models.Index(fields=('schedule_file', 'version')),
+        )
+
+    def __str__(self: 'ScheduleChange') -> str:
+        """Возвращает краткое описание изменения."""
+        return f'{self.schedule_file.name} {self.version}: {self.key}'
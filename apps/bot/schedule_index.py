@@ -0,0 +1,201 @@
+"""Модуль индекса расписания, построенного по одному Excel файлу."""
+
+import re
+import threading
+from collections.abc import Iterator
+from io import BytesIO
+from typing import NamedTuple
+
+import openpyxl
+
+from apps.bot.metrics import timed
+
+GroupLesson = tuple[str, str | int, str, bool]
+TeacherLesson = tuple[str, str | int, str, str, bool]
+
+_PAIR_NUMBER = re.compile(r'\s*(\d+)')
+
+MAX_PAIR = 16
+
+
+def pair_number(sheet_title: str) -> int | None:
+    """Возвращает номер пары из названия листа или None, если номера нет."""
+    match = _PAIR_NUMBER.match(sheet_title)
+    return int(match.group(1)) if match else None
+
+
+def normalize_surname(value: str) -> str:
+    """Приводит фамилию к виду, в котором она хранится в индексах."""
+    return value.strip().lower().replace('ё', 'е')
+
+
+def surname_key(teacher_name: str) -> str:
+    """Возвращает нормализованную фамилию из ФИО преподавателя (первое слово)."""
+    words = teacher_name.split()
+    return normalize_surname(words[0]) if words else ''
+
+
+def format_cell(value: object) -> str:
+    """Приводит значение ячейки к строке так же, как при выводе расписания."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        value = int(value)
+    return str(value).strip()
+
+
+def room_sort_key(room: str) -> tuple[bool, int, str]:
+    """Возвращает ключ сортировки кабинетов: сначала номера по возрастанию, затем названия."""
+    return (not room.isdecimal(), int(room) if room.isdecimal() else 0, room)
+
+
+class LessonRecord(NamedTuple):
+    """Занятие из файла расписания: тройка ячеек кабинет, группа, преподаватель."""
+
+    position: int
+    sheet_title: str
+    room: str | int | float | None
+    group: str | None
+    teacher: str | None
+    class_hour: bool
+
+    def as_group_lesson(self: 'LessonRecord') -> GroupLesson:
+        """Возвращает занятие в формате process_excel."""
+        return self.sheet_title, self.room, self.teacher, self.class_hour
+
+    def as_teacher_lesson(self: 'LessonRecord') -> TeacherLesson:
+        """Возвращает занятие в формате process_excel2."""
+        return self.sheet_title, self.room, self.group, self.teacher, self.class_hour
+
+
+def iter_rows(file_content: BytesIO) -> Iterator[tuple[str, tuple]]:
+    """Лениво перебирает строки всех листов Excel файла, начиная со второй.
+
+    Книга открывается в режиме только для чтения: строки читаются из XML листа по мере
+    перебора, а объекты ячеек и стилей не создаются, поэтому расход памяти не зависит от
+    размера файла.
+    """
+    wb = openpyxl.load_workbook(file_content, read_only=True)
+    try:
+        for sheet in wb.worksheets:
+            for row in sheet.iter_rows(min_row=2, values_only=True):
+                yield sheet.title, row
+    finally:
+        wb.close()
+
+
+def extract_lessons(file_content: BytesIO) -> Iterator[LessonRecord]:
+    """Перебирает занятия Excel файла за один проход.
+
+    Каждая строка листа состоит из троек ячеек кабинет, группа, преподаватель; тройка
+    считается занятием, если в ней указана группа или преподаватель.
+    """
+    position = 0
+    for sheet_title, row in iter_rows(file_content):
+
+        class_hour = 'Классный час' in row
+        for idx in range(0, len(row), 3):
+            room_number, group_name, teacher_name = (*row[idx:idx + 3], None, None)[:3]
+            if not isinstance(group_name, str) and not (
+                teacher_name and isinstance(teacher_name, str)
+            ):
+                continue
+
+            yield LessonRecord(
+                position, sheet_title, room_number, group_name, teacher_name, class_hour,
+            )
+            position += 1
+
+
+class ScheduleIndex:
+    """Индекс занятий файла расписания по группам, преподавателям и кабинетам."""
+
+    def __init__(self: 'ScheduleIndex') -> None:
+        """Создает пустой индекс."""
+        self.lessons: list[LessonRecord] = []
+        self.groups: dict[str, list[LessonRecord]] = {}
+        # Ключ - нормализованная фамилия, как у Educator.last_name.
+        self.teachers: dict[str, list[LessonRecord]] = {}
+        self.rooms: dict[str, list[LessonRecord]] = {}
+        # Битовая маска занятости кабинета: бит N установлен, если на N-й паре кабинет занят.
+        self.occupancy: dict[str, int] = {}
+
+    def add(self: 'ScheduleIndex', lesson: LessonRecord) -> None:
+        """Добавляет занятие во все ключи индекса."""
+        self.lessons.append(lesson)
+        if isinstance(lesson.group, str):
+            self.groups.setdefault(lesson.group, []).append(lesson)
+        if lesson.teacher and isinstance(lesson.teacher, str):
+            surname = surname_key(lesson.teacher)
+            if surname:
+                self.teachers.setdefault(surname, []).append(lesson)
+        room = format_cell(lesson.room)
+        if room:
+            self.rooms.setdefault(room, []).append(lesson)
+            if 'Классный час' not in room:
+                pair = pair_number(lesson.sheet_title)
+                bit = 1 << pair if pair and pair <= MAX_PAIR else 0
+                self.occupancy[room] = self.occupancy.get(room, 0) | bit
+
+    def for_group(self: 'ScheduleIndex', group_name: str) -> list[LessonRecord]:
+        """Возвращает занятия заданной группы."""
+        return list(self.groups.get(group_name, ()))
+
+    def for_teacher(self: 'ScheduleIndex', teacher_name: str) -> list[LessonRecord]:
+        """Возвращает занятия преподавателей с той же фамилией, что и в запросе."""
+        return list(self.teachers.get(surname_key(teacher_name), ()))
+
+    def for_room(self: 'ScheduleIndex', room: str) -> list[LessonRecord]:
+        """Возвращает занятия в заданном кабинете."""
+        return list(self.rooms.get(format_cell(room), ()))
+
+    def busy_pairs(self: 'ScheduleIndex', room: str) -> list[int]:
+        """Возвращает номера пар, на которых кабинет занят."""
+        mask = self.occupancy.get(format_cell(room), 0)
+        return [pair for pair in range(mask.bit_length()) if mask >> pair & 1]
+
+    def free_rooms(self: 'ScheduleIndex', pair: int) -> list[str]:
+        """Возвращает кабинеты из файла, свободные на заданной паре (от 1 до MAX_PAIR)."""
+        if not 1 <= pair <= MAX_PAIR:
+            msg = f'Номер пары должен быть от 1 до {MAX_PAIR}.'
+            raise ValueError(msg)
+        bit = 1 << pair
+        return sorted(
+            (room for room, mask in self.occupancy.items() if not mask & bit),
+            key=room_sort_key,
+        )
+
+
+@timed('build_index')
+def build_index(file_content: BytesIO) -> ScheduleIndex:
+    """Строит индекс по содержимому Excel файла за один проход."""
+    index = ScheduleIndex()
+    for lesson in extract_lessons(file_content):
+        index.add(lesson)
+    return index
+
+
+_INDEXES: dict[str, tuple[str, ScheduleIndex]] = {}
+
+_INDEXES_LOCK = threading.Lock()
+
+
+def cached_index(file_id: str, version: str) -> ScheduleIndex | None:
+    """Возвращает построенный ранее индекс заданной версии файла или None."""
+    with _INDEXES_LOCK:
+        cached = _INDEXES.get(file_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    return None
+
+
+def store_index(file_id: str, version: str, index: ScheduleIndex) -> None:
+    """Сохраняет индекс файла, заменяя индекс предыдущей версии."""
+    with _INDEXES_LOCK:
+        _INDEXES[file_id] = (version, index)
+
+
+def clear_indexes() -> None:
+    """Очищает кэш индексов."""
+    with _INDEXES_LOCK:
+        _INDEXES.clear()
@@ -0,0 +1,116 @@
+"""Модуль поиска преподавателей по фамилии."""
+
+import bisect
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.bot.models import Educator
+from apps.bot.schedule_index import normalize_surname
+
+_SIMILARITY_THRESHOLD = 0.3
+
+_LIMIT = 5
+
+
+def _trigrams(value: str) -> set[str]:
+    """Возвращает триграммы строки, дополненной пробелами по краям."""
+    padded = f'  {value} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class EducatorIndex:
+    """Индекс ФИО преподавателей по нормализованной фамилии.
+
+    Поиск по началу фамилии выполняется двоичным поиском по отсортированному списку
+    фамилий; если совпадений нет, используется поиск по триграммам, допускающий опечатки.
+    """
+
+    def __init__(self: 'EducatorIndex', educators: Iterable[tuple[str, str]]) -> None:
+        """Строит индекс по парам фамилия, ФИО."""
+        self._entries = sorted((normalize_surname(last_name), fio) for last_name, fio in educators)
+        self._keys = [key for key, _ in self._entries]
+        self._trigrams: dict[str, list[int]] = {}
+        for position, key in enumerate(self._keys):
+            for trigram in _trigrams(key):
+                self._trigrams.setdefault(trigram, []).append(position)
+
+    def _by_prefix(self: 'EducatorIndex', prefix: str) -> list[int]:
+        """Возвращает позиции фамилий, начинающихся с заданной строки."""
+        start = bisect.bisect_left(self._keys, prefix)
+        end = start
+        while end < len(self._keys) and self._keys[end].startswith(prefix):
+            end += 1
+        return sorted(range(start, end), key=lambda position: len(self._keys[position]))
+
+    def _by_similarity(self: 'EducatorIndex', query: str) -> list[int]:
+        """Возвращает позиции фамилий, похожих на заданную, по убыванию сходства."""
+        query_trigrams = _trigrams(query)
+        shared = Counter(
+            position
+            for trigram in query_trigrams
+            for position in self._trigrams.get(trigram, ())
+        )
+        scores = []
+        for position, count in shared.items():
+            similarity = count / (
+                len(query_trigrams) + len(_trigrams(self._keys[position])) - count
+            )
+            if similarity >= _SIMILARITY_THRESHOLD:
+                scores.append((-similarity, position))
+        return [position for _, position in sorted(scores)]
+
+    def search(self: 'EducatorIndex', query: str, limit: int = _LIMIT) -> list[str]:
+        """Возвращает ФИО преподавателей, подходящих под запрос, от наиболее точных."""
+        key = normalize_surname(query)
+        if not key:
+            return []
+        positions = self._by_prefix(key) or self._by_similarity(key)
+        return [self._entries[position][1] for position in positions[:limit]]
+
+
+_VERSION_KEY = 'educators:index-version'
+
+_LOCK = threading.Lock()
+
+_STATE: dict[str, EducatorIndex | str | None] = {'index': None, 'version': None}
+
+
+def _index_version() -> str:
+    """Возвращает версию списка преподавателей из общего для процессов кэша."""
+    return caches[settings.SCHEDULE_CACHE_ALIAS].get_or_set(
+        _VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None,
+    )
+
+
+def get_educator_index() -> EducatorIndex:
+    """Возвращает индекс преподавателей, строя его при первом обращении после изменений.
+
+    Индекс хранится в памяти процесса и перестраивается, когда версия в общем кэше
+    отличается от версии, по которой он построен, поэтому изменение преподавателей в
+    одном процессе сервера видно и в остальных.
+    """
+    version = _index_version()
+    with _LOCK:
+        if _STATE['index'] is None or _STATE['version'] != version:
+            _STATE['index'] = EducatorIndex(
+                (educator.last_name, str(educator)) for educator in Educator.objects.all()
+            )
+            _STATE['version'] = version
+        return _STATE['index']
+
+
+def invalidate_educator_index() -> None:
+    """Сбрасывает индекс преподавателей во всех процессах, меняя его версию в общем кэше."""
+    caches[settings.SCHEDULE_CACHE_ALIAS].set(_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    with _LOCK:
+        _STATE['index'] = None
+
+
+def search_educators(query: str) -> list[str]:
+    """Возвращает ФИО преподавателей, чья фамилия подходит под запрос."""
+    return get_educator_index().search(query)
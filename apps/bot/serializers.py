@@ -1,13 +1,19 @@
 """Сериализаторы для проекта lizard_bot."""
 
+from datetime import timedelta
+
+from django.conf import settings
 from rest_framework import serializers
 
+from apps.bot.schedule_index import MAX_PAIR
+
 
 class ScheduleRequestSerializer(serializers.Serializer):
     """Сериализатор для запросов расписания по группе."""
 
     date = serializers.CharField()
     group = serializers.CharField()
+    structured = serializers.BooleanField(required=False, default=False)
 
 
 class ScheduleTeacherSeriaizer(serializers.Serializer):
@@ -15,9 +21,149 @@ class ScheduleTeacherSeriaizer(serializers.Serializer):
 
     date = serializers.CharField()
     group = serializers.CharField()
+    structured = serializers.BooleanField(required=False, default=False)
+
+
+class LessonSerializer(serializers.Serializer):
+    """Сериализатор занятия для структурированного ответа."""
+
+    pair = serializers.IntegerField(allow_null=True)
+    title = serializers.CharField()
+    start = serializers.CharField(allow_null=True)
+    end = serializers.CharField(allow_null=True)
+    room = serializers.CharField(allow_blank=True)
+    group = serializers.CharField(allow_null=True)
+    teacher = serializers.CharField(allow_null=True)
+    class_hour = serializers.BooleanField()
+
+
+class StructuredScheduleSerializer(serializers.Serializer):
+    """Сериализатор структурированного расписания на дату."""
+
+    date = serializers.CharField()
+    query = serializers.CharField()
+    lessons = LessonSerializer(many=True)
+
+
+class RoomRequestSerializer(serializers.Serializer):
+    """Сериализатор для запросов расписания по кабинету."""
+
+    date = serializers.CharField()
+    room = serializers.CharField()
+
+
+class RoomScheduleSerializer(StructuredScheduleSerializer):
+    """Сериализатор занятий в кабинете на дату."""
+
+    busy_pairs = serializers.ListField(child=serializers.IntegerField())
+
+
+class FreeRoomsRequestSerializer(serializers.Serializer):
+    """Сериализатор для запросов свободных кабинетов."""
+
+    date = serializers.CharField()
+    pair = serializers.IntegerField(min_value=1, max_value=MAX_PAIR)
+
+
+class FreeRoomsSerializer(serializers.Serializer):
+    """Сериализатор списка свободных кабинетов на пару."""
+
+    date = serializers.CharField()
+    pair = serializers.IntegerField()
+    rooms = serializers.ListField(child=serializers.CharField())
+
+
+class ChangesRequestSerializer(serializers.Serializer):
+    """Сериализатор для запросов изменений расписания."""
+
+    date = serializers.CharField()
+    since = serializers.CharField(required=False, default='', allow_blank=True)
+    group = serializers.CharField(required=False)
+    teacher = serializers.CharField(required=False)
+
+
+class ScheduleChangeSerializer(serializers.Serializer):
+    """Сериализатор изменения занятий группы или преподавателя."""
+
+    version = serializers.CharField()
+    previous_version = serializers.CharField()
+    kind = serializers.CharField()
+    key = serializers.CharField()
+    added = serializers.ListField(child=serializers.DictField())
+    removed = serializers.ListField(child=serializers.DictField())
+    created_at = serializers.DateTimeField()
+
+
+class ScheduleChangesSerializer(serializers.Serializer):
+    """Сериализатор изменений расписания на дату."""
+
+    date = serializers.CharField()
+    version = serializers.CharField()
+    changes = ScheduleChangeSerializer(many=True)
 
 
 class FioSerializer(serializers.Serializer):
     """Сериализатор для запросов ФИО преподавателя."""
 
     fio = serializers.CharField()
+
+
+class BatchScheduleSerializer(serializers.Serializer):
+    """Сериализатор для пакетных запросов расписания на несколько дат."""
+
+    date = serializers.ListField(child=serializers.CharField(), required=False)
+    date_from = serializers.DateField(
+        required=False, input_formats=[settings.SCHEDULE_FILE_DATE_FORMAT],
+    )
+    date_to = serializers.DateField(
+        required=False, input_formats=[settings.SCHEDULE_FILE_DATE_FORMAT],
+    )
+    group = serializers.ListField(child=serializers.CharField(), required=False)
+    teacher = serializers.ListField(child=serializers.CharField(), required=False)
+
+    def validate(self: 'BatchScheduleSerializer', attrs: dict) -> dict:
+        """Разворачивает диапазон дат и проверяет размер пакета.
+
+        Длина диапазона проверяется до его разворачивания, чтобы запрос с огромным
+        диапазоном не создавал список дат.
+        """
+        max_dates = settings.SCHEDULE_BATCH_MAX_DATES
+        too_many_dates = f'Не больше {max_dates} дат в одном запросе.'
+        dates = list(dict.fromkeys(attrs.get('date', [])))
+        date_from, date_to = attrs.get('date_from'), attrs.get('date_to')
+
+        if (date_from is None) != (date_to is None):
+            msg = 'date_from и date_to задаются вместе.'
+            raise serializers.ValidationError(msg)
+        if date_from is not None:
+            if date_from > date_to:
+                msg = 'date_from не может быть позже date_to.'
+                raise serializers.ValidationError(msg)
+            days = (date_to - date_from).days + 1
+            if days > max_dates:
+                raise serializers.ValidationError(too_many_dates)
+            dates.extend(
+                (date_from + timedelta(days=offset)).strftime(settings.SCHEDULE_FILE_DATE_FORMAT)
+                for offset in range(days)
+            )
+
+        dates = list(dict.fromkeys(dates))
+        if not dates:
+            msg = 'Укажите date или date_from и date_to.'
+            raise serializers.ValidationError(msg)
+        if len(dates) > max_dates:
+            raise serializers.ValidationError(too_many_dates)
+
+        groups = list(dict.fromkeys(attrs.get('group', [])))
+        teachers = list(dict.fromkeys(attrs.get('teacher', [])))
+        if not groups and not teachers:
+            msg = 'Укажите хотя бы одну группу или преподавателя.'
+            raise serializers.ValidationError(msg)
+        if len(groups) + len(teachers) > settings.SCHEDULE_BATCH_MAX_QUERIES:
+            msg = (
+                f'Не больше {settings.SCHEDULE_BATCH_MAX_QUERIES} групп и преподавателей '
+                'в одном запросе.'
+            )
+            raise serializers.ValidationError(msg)
+
+        return {'dates': dates, 'groups': groups, 'teachers': teachers}
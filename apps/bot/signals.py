@@ -0,0 +1,16 @@
+"""Обработчики сигналов приложения bot."""
+
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.bot.models import Educator
+from apps.bot.search import invalidate_educator_index
+
+
+@receiver(post_save, sender=Educator)
+@receiver(post_delete, sender=Educator)
+def refresh_educator_index(**_kwargs: Any) -> None:
+    """Сбрасывает индекс поиска преподавателей после изменения списка преподавателей."""
+    invalidate_educator_index()
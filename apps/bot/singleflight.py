@@ -0,0 +1,99 @@
+"""Модуль объединения одновременных одинаковых вычислений в одно."""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import CancelledError, Future
+from typing import Generic, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight(Generic[T]):
+    """Выполняет вычисление по ключу не более одного раза одновременно.
+
+    Пока вычисление выполняется, остальные вызовы с тем же ключом ждут его результата
+    (или исключения) вместо того, чтобы запускать собственное. Синхронные и асинхронные
+    вызовы используют общий набор выполняющихся вычислений.
+
+    Асинхронное вычисление выполняется отдельной задачей, поэтому отмена или таймаут
+    одного из ожидающих не прерывает его для остальных. Если вычисление все же прервано
+    (отменой задачи или BaseException), ключ освобождается и ожидающие запускают его
+    заново.
+    """
+
+    def __init__(self: 'SingleFlight') -> None:
+        """Создает пустой набор выполняющихся вычислений."""
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def _join(self: 'SingleFlight', key: Hashable) -> tuple[Future, bool]:
+        """Возвращает future вычисления и признак того, что вызывающий должен его выполнить."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self: 'SingleFlight', key: Hashable) -> None:
+        """Удаляет завершенное вычисление из набора."""
+        with self._lock:
+            del self._calls[key]
+
+    def _run(self: 'SingleFlight', key: Hashable, future: Future, func: Callable[[], T]) -> None:
+        """Выполняет функцию и передает ее результат в future."""
+        try:
+            result = func()
+        except Exception as exc:  # noqa: BLE001
+            future.set_exception(exc)
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._finish(key)
+
+    async def _arun(
+        self: 'SingleFlight', key: Hashable, future: Future, func: Callable[[], Awaitable[T]],
+    ) -> None:
+        """Выполняет корутину и передает ее результат в future."""
+        try:
+            result = await func()
+        except Exception as exc:  # noqa: BLE001
+            future.set_exception(exc)
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._finish(key)
+
+    def do(self: 'SingleFlight', key: Hashable, func: Callable[[], T]) -> T:
+        """Выполняет функцию или дожидается результата уже выполняющегося вызова."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                self._run(key, future, func)
+            try:
+                return future.result()
+            except CancelledError:
+                continue
+
+    async def ado(self: 'SingleFlight', key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Асинхронно выполняет корутину или дожидается результата уже выполняющегося вызова."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                task = asyncio.get_running_loop().create_task(self._arun(key, future, func))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
@@ -0,0 +1,166 @@
+"""Модуль компактных снимков индекса расписания.
+
+Снимок хранит занятия файла в виде таблицы строк и массива целых чисел - это формат
+быстрой десериализации: при перезапуске процесса индекс восстанавливается из снимка за
+миллисекунды без повторного разбора xlsx. Каждый процесс декодирует снимок в собственный
+ScheduleIndex; между процессами делится только страничный кэш ОС с байтами файла.
+
+Формат (порядок байт - как у записавшей снимок машины):
+    заголовок - сигнатура, версия формата, порядок байт, число строк и занятий;
+    смещения строк - uint32 на каждую строку и еще одно в конце;
+    занятия - по шесть uint32: позиция, название листа, кабинет, группа, преподаватель,
+    признак классного часа;
+    строки - UTF-8 без разделителей, строка 0 - версия исходного файла.
+Значения ячеек кодируются как номер строки, сдвинутый на два бита, и тип в младших битах.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from apps.bot.mirror import write_atomic
+from apps.bot.schedule_index import LessonRecord, ScheduleIndex
+
+_MAGIC = b'SCHEDIDX'
+
+_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sBBxxII')
+
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+
+_FIELDS = 6
+
+_NONE, _STR, _INT, _FLOAT = range(4)
+
+
+def source_key(file: dict) -> str:
+    """Возвращает версию исходного файла, при изменении которой снимок устаревает."""
+    return file.get('md5Checksum') or file.get('modifiedTime', '')
+
+
+class _StringTable:
+    """Таблица строк снимка, хранящая каждую строку один раз."""
+
+    def __init__(self: '_StringTable') -> None:
+        """Создает пустую таблицу."""
+        self.numbers: dict[str, int] = {}
+        self.strings: list[str] = []
+
+    def add(self: '_StringTable', value: str) -> int:
+        """Возвращает номер строки, добавляя ее при первом появлении."""
+        number = self.numbers.get(value)
+        if number is None:
+            number = self.numbers[value] = len(self.strings)
+            self.strings.append(value)
+        return number
+
+    def encode(self: '_StringTable', value: object) -> int:
+        """Кодирует значение ячейки номером строки и типом."""
+        if value is None:
+            return _NONE
+        if isinstance(value, bool) or not isinstance(value, int | float):
+            return self.add(str(value)) << 2 | _STR
+        tag = _INT if isinstance(value, int) else _FLOAT
+        return self.add(repr(value)) << 2 | tag
+
+
+def _decode(strings: list[str], code: int) -> str | int | float | None:
+    """Восстанавливает значение ячейки по его коду."""
+    tag = code & 3
+    if tag == _NONE:
+        return None
+    value = strings[code >> 2]
+    if tag == _INT:
+        return int(value)
+    if tag == _FLOAT:
+        return float(value)
+    return value
+
+
+def dump_index(index: ScheduleIndex, source: str) -> bytes:
+    """Сериализует занятия индекса в снимок для заданной версии исходного файла."""
+    table = _StringTable()
+    table.add(source)
+    lessons = array('I')
+    for lesson in index.lessons:
+        lessons.extend((
+            lesson.position,
+            table.encode(lesson.sheet_title),
+            table.encode(lesson.room),
+            table.encode(lesson.group),
+            table.encode(lesson.teacher),
+            int(lesson.class_hour),
+        ))
+
+    encoded = [value.encode() for value in table.strings]
+    offsets = array('I', [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+
+    header = _HEADER.pack(
+        _MAGIC,
+        _FORMAT_VERSION,
+        _BYTE_ORDERS[sys.byteorder],
+        len(encoded),
+        len(index.lessons),
+    )
+    return header + offsets.tobytes() + lessons.tobytes() + b''.join(encoded)
+
+
+def write_snapshot(path: Path, index: ScheduleIndex, source: str) -> None:
+    """Записывает снимок индекса рядом с копией файла."""
+    write_atomic(path, dump_index(index, source))
+
+
+def _load(view: memoryview, source: str) -> ScheduleIndex | None:
+    """Строит индекс по содержимому снимка или возвращает None, если снимок не подходит."""
+    magic, version, byte_order, string_count, lesson_count = _HEADER.unpack_from(view)
+    if (magic, version, byte_order) != (
+        _MAGIC, _FORMAT_VERSION, _BYTE_ORDERS[sys.byteorder],
+    ):
+        return None
+
+    lessons_start = _HEADER.size + (string_count + 1) * 4
+    blob_start = lessons_start + lesson_count * _FIELDS * 4
+    with (
+        view[_HEADER.size:lessons_start].cast('I') as offsets,
+        view[lessons_start:blob_start].cast('I') as lessons,
+        view[blob_start:] as blob,
+    ):
+        strings = [
+            str(blob[offsets[number]:offsets[number + 1]], 'utf-8')
+            for number in range(string_count)
+        ]
+        if strings[0] != source:
+            return None
+
+        index = ScheduleIndex()
+        for start in range(0, len(lessons), _FIELDS):
+            position, title, room, group, teacher, class_hour = lessons[start:start + _FIELDS]
+            index.add(LessonRecord(
+                position,
+                _decode(strings, title),
+                _decode(strings, room),
+                _decode(strings, group),
+                _decode(strings, teacher),
+                bool(class_hour),
+            ))
+    return index
+
+
+def load_snapshot(path: Path, source: str) -> ScheduleIndex | None:
+    """Загружает индекс из снимка.
+
+    Возвращает None, если снимка нет, он поврежден, записан в другом формате или для
+    другой версии исходного файла.
+    """
+    try:
+        with path.open('rb') as snapshot, mmap.mmap(
+            snapshot.fileno(), 0, access=mmap.ACCESS_READ,
+        ) as mapped, memoryview(mapped) as view:
+            return _load(view, source)
+    except (OSError, ValueError, IndexError, TypeError, struct.error):
+        return None
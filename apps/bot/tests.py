@@ -1 +1,1044 @@
 """Модуль тестирования."""
+
+import asyncio
+import hashlib
+import inspect
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+import openpyxl
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from googleapiclient.errors import HttpError
+
+from apps.bot import (
+    benchmarks,
+    drive,
+    loadtest,
+    metrics,
+    schedule_index,
+    search,
+    snapshot,
+    utils,
+)
+from apps.bot.content_cache import ContentCache, clear_content_caches
+from apps.bot.importer import import_schedule, is_imported
+from apps.bot.listing import FolderListing
+from apps.bot.models import Educator, Lesson, ScheduleChange, ScheduleFile
+from apps.bot.singleflight import SingleFlight
+from apps.bot.utils import get_fio, process_excel, process_excel2, service, sync_mirror
+
+
+def make_workbook(sheets: dict[str, list[tuple]]) -> BytesIO:
+    """Создает Excel файл расписания с заданными листами."""
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for title, rows in sheets.items():
+        sheet = wb.create_sheet(title)
+        sheet.append(('Кабинет', 'Группа', 'Преподаватель'))
+        for row in rows:
+            sheet.append(row)
+    content = BytesIO()
+    wb.save(content)
+    content.seek(0)
+    return content
+
+
+def use_local_folder(test: SimpleTestCase, names: list[str]) -> Path:
+    """Подключает к тесту локальную папку с файлами расписания вместо Google Drive."""
+    folder = tempfile.TemporaryDirectory()
+    test.addCleanup(folder.cleanup)
+    for name in names:
+        (Path(folder.name) / name).write_bytes(make_workbook(SCHEDULE).getvalue())
+
+    settings_override = override_settings(SCHEDULE_LOCAL_FOLDER=Path(folder.name))
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+    utils._FOLDER_LISTING.invalidate()  # noqa: SLF001
+    schedule_index.clear_indexes()
+    clear_content_caches()
+    cache.clear()
+    return Path(folder.name)
+
+
+SCHEDULE = {
+    '1 пара': [
+        (101, 'ИС-21', 'Иванов И.И.', 102, 'ПР-22', 'Петрова П.П.'),
+        (103, 'ИС-22', 'Иванова А.А.', 104, 'ИС-23', None),
+    ],
+    '2 пара': [
+        ('Спортзал', 'ИС-21', 'Петрова П.П.', 101, 'ПР-22', 'Классный час'),
+    ],
+}
+
+
+class ScheduleIndexTest(SimpleTestCase):
+    """Тесты индекса расписания."""
+
+    def setUp(self: 'ScheduleIndexTest') -> None:
+        """Очищает кэш индексов перед каждым тестом."""
+        schedule_index.clear_indexes()
+
+    def test_group_lessons(self: 'ScheduleIndexTest') -> None:
+        """Занятия группы возвращаются в порядке листов."""
+        self.assertEqual(
+            process_excel(make_workbook(SCHEDULE), 'ИС-21'),
+            [
+                ('1 пара', 101, 'Иванов И.И.', False),
+                ('2 пара', 'Спортзал', 'Петрова П.П.', True),
+            ],
+        )
+
+    def test_teacher_lessons_by_surname(self: 'ScheduleIndexTest') -> None:
+        """Преподаватель ищется по точному совпадению фамилии."""
+        content = make_workbook(SCHEDULE)
+        self.assertEqual(
+            [lesson[2] for lesson in process_excel2(content, 'иванов')],
+            ['ИС-21'],
+        )
+        content.seek(0)
+        self.assertEqual(
+            [lesson[0] for lesson in process_excel2(content, 'Петрова П.П.')],
+            ['1 пара', '2 пара'],
+        )
+
+    def test_room_lessons(self: 'ScheduleIndexTest') -> None:
+        """Занятия кабинета находятся по номеру кабинета."""
+        index = schedule_index.build_index(make_workbook(SCHEDULE))
+        self.assertEqual([lesson.group for lesson in index.for_room('101')], ['ИС-21', 'ПР-22'])
+
+    def test_rows_streamed_read_only(self: 'ScheduleIndexTest') -> None:
+        """Строки перебираются лениво из книги только для чтения, закрываемой после перебора."""
+        load_workbook = openpyxl.load_workbook
+        opened = []
+
+        def open_workbook(*args: object, **kwargs: object) -> openpyxl.Workbook:
+            workbook = load_workbook(*args, **kwargs)
+            workbook.close = mock.Mock(wraps=workbook.close)
+            opened.append(workbook)
+            return workbook
+
+        with mock.patch.object(
+            schedule_index.openpyxl, 'load_workbook', side_effect=open_workbook,
+        ) as load:
+            rows = schedule_index.iter_rows(make_workbook(SCHEDULE))
+            self.assertTrue(inspect.isgenerator(rows))
+            load.assert_not_called()
+
+            self.assertEqual(next(rows)[0], '1 пара')
+            self.assertEqual(load.call_args.kwargs, {'read_only': True})
+            opened[0].close.assert_not_called()
+            rows.close()
+
+        opened[0].close.assert_called_once()
+
+    def test_index_rebuilt_on_new_version(self: 'ScheduleIndexTest') -> None:
+        """Индекс строится один раз для версии файла и перестраивается при ее смене."""
+        schedule_index.clear_indexes()
+        self.addCleanup(schedule_index.clear_indexes)
+        file = {'id': 'file', 'name': '01.09.2024.xlsx', 'modifiedTime': 'v1'}
+
+        with mock.patch.object(
+            utils, 'load_file_content', side_effect=lambda _: make_workbook(SCHEDULE),
+        ) as load:
+            first = utils.get_schedule_index(file)
+            self.assertIs(utils.get_schedule_index(file), first)
+            self.assertIsNot(utils.get_schedule_index({**file, 'modifiedTime': 'v2'}), first)
+        self.assertEqual(load.call_count, 2)
+
+
+class FolderListingTest(SimpleTestCase):
+    """Тесты кэша списка файлов папки."""
+
+    def test_listing_cached_until_ttl(self: 'FolderListingTest') -> None:
+        """Папка перечитывается только после истечения времени жизни кэша."""
+        fetch = mock.Mock(return_value=[{'id': '1', 'name': '01.09.2024.xlsx'}])
+        listing = FolderListing(fetch, lambda: 60)
+
+        self.assertEqual(listing.get('01.09.2024.xlsx'), {'id': '1', 'name': '01.09.2024.xlsx'})
+        self.assertIsNone(listing.get('02.09.2024.xlsx'))
+        self.assertEqual(fetch.call_count, 1)
+
+        listing.invalidate()
+        listing.files()
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_all_pages_listed(self: 'FolderListingTest') -> None:
+        """При обновлении списка файлов запрашиваются все страницы."""
+        drive_service = mock.Mock()
+        drive_service.files.return_value.list.return_value.execute.side_effect = [
+            {'files': [{'id': '1', 'name': 'a.xlsx'}], 'nextPageToken': 'next'},
+            {'files': [{'id': '2', 'name': 'b.xlsx'}]},
+        ]
+        with mock.patch.object(drive, 'get_drive_service', return_value=drive_service):
+            files = drive.list_files('folder')
+
+        self.assertEqual([file['id'] for file in files], ['1', '2'])
+
+
+class ContentCacheTest(SimpleTestCase):
+    """Тесты кэша содержимого скачанных файлов."""
+
+    def test_evicted_by_size(self: 'ContentCacheTest') -> None:
+        """Давно не использованные файлы вытесняются, когда объем превышает лимит."""
+        content_cache = ContentCache(max_bytes=10)
+        content_cache.put(('a', 'v1'), b'aaaa')
+        content_cache.put(('b', 'v1'), b'bbbb')
+        content_cache.get(('a', 'v1'))
+        content_cache.put(('c', 'v1'), b'cccc')
+
+        self.assertIsNone(content_cache.get(('b', 'v1')))
+        self.assertEqual(content_cache.get(('a', 'v1')), b'aaaa')
+        content_cache.put(('a', 'v2'), b'AA')
+        self.assertIsNone(content_cache.get(('a', 'v1')))
+        self.assertEqual(
+            content_cache.stats(),
+            {'hits': 2, 'disk_hits': 0, 'misses': 2, 'evictions': 1, 'entries': 2, 'bytes': 6},
+        )
+
+    def test_spill_to_disk(self: 'ContentCacheTest') -> None:
+        """Вытесненные файлы читаются из папки на диске."""
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        content_cache = ContentCache(max_bytes=4, spill_dir=Path(folder.name))
+        content_cache.put(('a', 'v1'), b'aaaa')
+        content_cache.put(('b', 'v1'), b'bbbb')
+
+        self.assertEqual(content_cache.get(('a', 'v1')), b'aaaa')
+        self.assertEqual(content_cache.stats()['disk_hits'], 1)
+
+    def test_spill_dir_bounded(self: 'ContentCacheTest') -> None:
+        """Объем папки вытесненных файлов ограничен, удаляются давно не читавшиеся."""
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        content_cache = ContentCache(max_bytes=1, spill_dir=Path(folder.name), spill_max_bytes=8)
+        content_cache.put(('a', 'v1'), b'aaaa')
+        time.sleep(0.01)
+        content_cache.put(('b', 'v1'), b'bbbb')
+        time.sleep(0.01)
+        content_cache.get(('a', 'v1'))
+        time.sleep(0.01)
+        content_cache.put(('c', 'v1'), b'cccc')
+
+        self.assertEqual(len(list(Path(folder.name).iterdir())), 2)
+        self.assertEqual(content_cache.get(('a', 'v1')), b'aaaa')
+        self.assertIsNone(content_cache.get(('b', 'v1')))
+
+    def test_spill_keeps_other_workers_tmp(self: 'ContentCacheTest') -> None:
+        """Запись на диск не удаляет временные файлы, которые пишут другие процессы."""
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        content_cache = ContentCache(max_bytes=1, spill_dir=Path(folder.name))
+        other = content_cache._spill_path(('a', 'v2'))  # noqa: SLF001
+        tmp = other.with_name(f'{other.name}.1.tmp')
+        tmp.write_bytes(b'AAAA')
+
+        content_cache.put(('a', 'v1'), b'aaaa')
+
+        self.assertTrue(tmp.exists())
+        self.assertEqual(content_cache.get(('a', 'v1')), b'aaaa')
+
+    def test_spill_failure_ignored(self: 'ContentCacheTest') -> None:
+        """Ошибка записи на диск не прерывает запрос, запись просто не сохраняется."""
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        spill_dir = Path(folder.name) / 'spill'
+        spill_dir.write_bytes(b'')
+        content_cache = ContentCache(max_bytes=4, spill_dir=spill_dir)
+
+        with self.assertLogs('apps.bot.content_cache', 'ERROR'):
+            content_cache.put(('a', 'v1'), b'aaaa')
+            content_cache.put(('b', 'v1'), b'bbbb')
+            self.assertIsNone(content_cache.get(('a', 'v1')))
+        self.assertEqual(content_cache.get(('b', 'v1')), b'bbbb')
+
+    def test_download_reused(self: 'ContentCacheTest') -> None:
+        """Повторная загрузка той же версии файла не обращается к Google Drive."""
+        use_local_folder(self, ['01.09.2024.xlsx'])
+        file = utils.find_file('01.09.2024')
+
+        with mock.patch.object(utils, 'download_file', wraps=utils.download_file) as download:
+            first = utils.load_file_content(file).getvalue()
+            second = utils.load_file_content(file).getvalue()
+
+        self.assertEqual(first, second)
+        self.assertEqual(download.call_count, 1)
+
+
+class ScheduleMirrorTest(SimpleTestCase):
+    """Тесты локального зеркала расписаний с локальной папкой вместо Google Drive."""
+
+    def setUp(self: 'ScheduleMirrorTest') -> None:
+        """Создает папку с файлом расписания и пустое зеркало."""
+        folder = tempfile.TemporaryDirectory()
+        mirror = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.addCleanup(mirror.cleanup)
+        self.folder = Path(folder.name)
+        (self.folder / '01.09.2024.xlsx').write_bytes(make_workbook(SCHEDULE).getvalue())
+
+        settings_override = override_settings(
+            SCHEDULE_LOCAL_FOLDER=self.folder,
+            SCHEDULE_MIRROR_DIR=Path(mirror.name),
+            SCHEDULE_USE_MIRROR=True,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        utils._FOLDER_LISTING.invalidate()  # noqa: SLF001
+        schedule_index.clear_indexes()
+        clear_content_caches()
+        cache.clear()
+
+    def test_service_reads_mirror(self: 'ScheduleMirrorTest') -> None:
+        """После синхронизации расписание читается из зеркала."""
+        call_command('sync_schedules', stdout=StringIO())
+
+        with mock.patch.object(utils, 'download_file') as download_file:
+            result = service('01.09.2024', 'ис-21')
+
+        download_file.assert_not_called()
+        self.assertIn('Иванов И.И.', result)
+        self.assertEqual(
+            utils.get_content_cache(
+                settings.SCHEDULE_CONTENT_CACHE_BYTES,
+                settings.SCHEDULE_CONTENT_SPILL_DIR,
+                settings.SCHEDULE_CONTENT_SPILL_BYTES,
+            ).stats()['entries'],
+            0,
+        )
+
+    def test_only_changed_files_downloaded(self: 'ScheduleMirrorTest') -> None:
+        """Повторная синхронизация не скачивает неизмененные файлы."""
+        self.assertEqual(len(sync_mirror()), 1)
+        self.assertEqual(sync_mirror(), [])
+
+        (self.folder / '02.09.2024.xlsx').write_bytes(make_workbook(SCHEDULE).getvalue())
+        self.assertEqual([file['name'] for file in sync_mirror()], ['02.09.2024.xlsx'])
+
+    def test_index_loaded_from_snapshot(self: 'ScheduleMirrorTest') -> None:
+        """После перезапуска индекс загружается из снимка без разбора xlsx."""
+        sync_mirror()
+        expected = service('01.09.2024', 'ис-21')
+        self.assertTrue(
+            (Path(settings.SCHEDULE_MIRROR_DIR) / '01.09.2024.xlsx.idx').exists(),
+        )
+
+        schedule_index.clear_indexes()
+        cache.clear()
+        with mock.patch.object(utils, 'build_index') as build:
+            self.assertEqual(service('01.09.2024', 'ис-21'), expected)
+        build.assert_not_called()
+
+
+class SnapshotTest(SimpleTestCase):
+    """Тесты снимков индекса расписания."""
+
+    def setUp(self: 'SnapshotTest') -> None:
+        """Создает индекс с разными типами ячеек и временную папку."""
+        sheets = {**SCHEDULE, '3 пара': [(201.5, 'ИС-31', None, 7, None, 'Сидоров С.С.')]}
+        self.index = schedule_index.build_index(make_workbook(sheets))
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = Path(folder.name) / 'file.idx'
+
+    def test_round_trip(self: 'SnapshotTest') -> None:
+        """Из снимка восстанавливаются те же занятия с теми же типами ячеек."""
+        snapshot.write_snapshot(self.path, self.index, 'md5')
+        loaded = snapshot.load_snapshot(self.path, 'md5')
+
+        self.assertEqual(loaded.lessons, self.index.lessons)
+        self.assertEqual(loaded.groups, self.index.groups)
+        self.assertEqual(loaded.teachers, self.index.teachers)
+
+    def test_stale_or_broken_snapshot_ignored(self: 'SnapshotTest') -> None:
+        """Снимок другой версии файла или поврежденный снимок не загружается."""
+        snapshot.write_snapshot(self.path, self.index, 'md5')
+        self.assertIsNone(snapshot.load_snapshot(self.path, 'other'))
+
+        self.path.write_bytes(self.path.read_bytes()[:40])
+        self.assertIsNone(snapshot.load_snapshot(self.path, 'md5'))
+        self.assertIsNone(snapshot.load_snapshot(self.path.with_name('missing.idx'), 'md5'))
+
+
+class ImportScheduleTest(TestCase):
+    """Тесты импорта занятий в базу данных."""
+
+    def test_import_lessons(self: 'ImportScheduleTest') -> None:
+        """Занятия сохраняются с номером пары и ссылкой на преподавателя."""
+        educator = Educator.objects.create(
+            first_name='Иван', last_name='Иванов', middle_name='Иванович',
+        )
+        file = {'id': 'file', 'name': '01.09.2024.xlsx', 'modifiedTime': 'v1'}
+        schedule_file = import_schedule(file, make_workbook(SCHEDULE))
+        lessons = Lesson.objects.filter(sheet__schedule_file=schedule_file)
+
+        self.assertTrue(is_imported(file))
+        self.assertEqual(
+            list(
+                lessons.filter(group='ИС-21')
+                .values_list('pair_number', 'room', 'teacher_name', 'class_hour'),
+            ),
+            [(1, '101', 'Иванов И.И.', False), (2, 'Спортзал', 'Петрова П.П.', True)],
+        )
+        self.assertEqual(
+            list(
+                lessons.filter(teacher=educator).values_list('group', flat=True),
+            ),
+            ['ИС-21'],
+        )
+
+        import_schedule({**file, 'modifiedTime': 'v2'}, make_workbook(SCHEDULE))
+        self.assertEqual(Lesson.objects.count(), 6)
+
+    def test_sync_retries_failed_import(self: 'ImportScheduleTest') -> None:
+        """Ошибка импорта файла не прерывает импорт остальных и повторяется при синхронизации."""
+        folder = use_local_folder(self, ['01.09.2024.xlsx'])
+        (folder / '02.09.2024.xlsx').write_bytes(b'not a workbook')
+        mirror = tempfile.TemporaryDirectory()
+        self.addCleanup(mirror.cleanup)
+
+        with override_settings(SCHEDULE_MIRROR_DIR=Path(mirror.name)):
+            out, err = StringIO(), StringIO()
+            with (
+                self.assertLogs('apps.bot.management.commands.sync_schedules', 'ERROR'),
+                self.assertRaises(CommandError),
+            ):
+                call_command('sync_schedules', '--import', stdout=out, stderr=err)
+            self.assertIn('Импортирован файл 01.09.2024.xlsx\n', out.getvalue())
+            self.assertEqual(err.getvalue(), 'Ошибка импорта файла 02.09.2024.xlsx\n')
+            self.assertFalse(ScheduleFile.objects.filter(name='02.09.2024.xlsx').exists())
+
+            (folder / '02.09.2024.xlsx').write_bytes(make_workbook(SCHEDULE).getvalue())
+            utils._FOLDER_LISTING.invalidate()  # noqa: SLF001
+            out = StringIO()
+            call_command('sync_schedules', '--import', stdout=out)
+
+        self.assertIn('Импортирован файл 02.09.2024.xlsx\n', out.getvalue())
+        self.assertTrue(ScheduleFile.objects.filter(name='02.09.2024.xlsx').exists())
+
+    def test_reuploaded_file_replaces_previous(self: 'ImportScheduleTest') -> None:
+        """Заново загруженный файл с новым идентификатором заменяет прежний импорт."""
+        file = {'id': 'old', 'name': '01.09.2024.xlsx', 'modifiedTime': 'v1'}
+        import_schedule(file, make_workbook(SCHEDULE))
+        corrected = {
+            **SCHEDULE,
+            '1 пара': [
+                (105, 'ИС-21', 'Иванов И.И.', 102, 'ПР-22', 'Петрова П.П.'),
+                (103, 'ИС-22', 'Иванова А.А.', 104, 'ИС-23', None),
+            ],
+        }
+        import_schedule({**file, 'id': 'new', 'modifiedTime': 'v2'}, make_workbook(corrected))
+
+        self.assertEqual(
+            list(ScheduleFile.objects.values_list('drive_id', 'modified_time')), [('new', 'v2')],
+        )
+        self.assertEqual(
+            set(ScheduleChange.objects.values_list('kind', 'key')),
+            {('group', 'ИС-21'), ('teacher', 'иванов')},
+        )
+
+    def test_changes_between_versions(self: 'ImportScheduleTest') -> None:
+        """При импорте новой версии сохраняются изменения групп и преподавателей."""
+        file = {'id': 'file', 'name': '01.09.2024.xlsx', 'modifiedTime': 'v1'}
+        import_schedule(file, make_workbook(SCHEDULE))
+        self.assertFalse(ScheduleChange.objects.exists())
+
+        corrected = {
+            **SCHEDULE,
+            '1 пара': [
+                (105, 'ИС-21', 'Иванов И.И.', 102, 'ПР-22', 'Петрова П.П.'),
+                (103, 'ИС-22', 'Иванова А.А.', 104, 'ИС-23', None),
+            ],
+        }
+        import_schedule({**file, 'modifiedTime': 'v2'}, make_workbook(corrected))
+
+        response = self.client.get(
+            '/api/changes/', {'date': '01.09.2024', 'since': 'v1', 'group': 'ис-21'},
+        )
+        data = response.json()
+        self.assertEqual(data['version'], 'v2')
+        self.assertEqual(len(data['changes']), 1)
+        change = data['changes'][0]
+        self.assertEqual((change['kind'], change['key']), ('group', 'ИС-21'))
+        self.assertEqual([lesson['room'] for lesson in change['added']], ['105'])
+        self.assertEqual([lesson['room'] for lesson in change['removed']], ['101'])
+
+        self.assertEqual(
+            set(ScheduleChange.objects.values_list('kind', 'key')),
+            {('group', 'ИС-21'), ('teacher', 'иванов')},
+        )
+        response = self.client.get('/api/changes/', {'date': '01.09.2024', 'since': 'v2'})
+        self.assertEqual(response.json()['changes'], [])
+
+
+class AsyncViewsTest(SimpleTestCase):
+    """Тесты асинхронных представлений."""
+
+    def setUp(self: 'AsyncViewsTest') -> None:
+        """Подключает локальную папку с файлом расписания вместо Google Drive."""
+        use_local_folder(self, ['01.09.2024.xlsx'])
+
+    async def test_async_service_matches_sync(self: 'AsyncViewsTest') -> None:
+        """Асинхронное представление возвращает то же расписание, что и синхронное."""
+        params = {'date': '01.09.2024', 'group': 'ис-21'}
+        async_response = await self.async_client.get('/api/async/service/', params)
+        sync_response = await self.async_client.get('/api/service/', params)
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertIn('Иванов И.И.', async_response.json())
+
+    async def test_async_service_timeout(self: 'AsyncViewsTest') -> None:
+        """При превышении таймаута возвращается ошибка 504."""
+        with (
+            override_settings(SCHEDULE_ASYNC_TIMEOUT=0.01),
+            mock.patch.object(utils, 'find_file', side_effect=lambda _: time.sleep(0.2)),
+        ):
+            response = await self.async_client.get(
+                '/api/async/service/', {'date': '01.09.2024', 'group': 'ис-21'},
+            )
+
+        self.assertEqual(response.status_code, 504)
+
+    async def test_async_validators_under_timeout(self: 'AsyncViewsTest') -> None:
+        """Поиск файла для ETag тоже ограничен таймаутом."""
+        with (
+            override_settings(SCHEDULE_ASYNC_TIMEOUT=0.01),
+            mock.patch(
+                'apps.bot.views.schedule_validators',
+                side_effect=lambda *_, **__: time.sleep(0.2),
+            ),
+        ):
+            response = await self.async_client.get(
+                '/api/async/teachers/', {'date': '01.09.2024', 'group': 'иванов'},
+            )
+
+        self.assertEqual(response.status_code, 504)
+
+    async def test_async_file_list_errors(self: 'AsyncViewsTest') -> None:
+        """Ошибки и таймаут получения списка файлов возвращаются в виде JSON."""
+        with override_settings(SCHEDULE_LOCAL_FOLDER_ERROR_RATE=1):
+            response = await self.async_client.get('/api/async/files/')
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('Injected error', response.json()['error'])
+
+        with (
+            override_settings(SCHEDULE_ASYNC_TIMEOUT=0.01),
+            mock.patch.object(utils, 'get_filenames', side_effect=lambda: time.sleep(0.2)),
+        ):
+            response = await self.async_client.get('/api/async/files/')
+        self.assertEqual(response.status_code, 504)
+
+    async def test_async_structured_matches_sync(self: 'AsyncViewsTest') -> None:
+        """Структурированный ответ и его ETag совпадают с ответом синхронного представления."""
+        for path, query in (('service', 'ис-21'), ('teachers', 'иванов')):
+            params = {'date': '01.09.2024', 'group': query, 'structured': 'true'}
+            async_response = await self.async_client.get(f'/api/async/{path}/', params)
+            sync_response = await self.async_client.get(f'/api/{path}/', params)
+
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(async_response.json(), sync_response.json())
+            self.assertEqual(async_response['ETag'], sync_response['ETag'])
+
+            text_response = await self.async_client.get(
+                f'/api/async/{path}/',
+                {'date': '01.09.2024', 'group': query},
+                headers={'If-None-Match': async_response['ETag']},
+            )
+            self.assertEqual(text_response.status_code, 200)
+
+
+class SingleFlightTest(SimpleTestCase):
+    """Тесты объединения одновременных вычислений."""
+
+    def test_concurrent_calls_share_result(self: 'SingleFlightTest') -> None:
+        """Одновременные вызовы с одним ключом выполняют функцию один раз."""
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def load() -> str:
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'index'
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(flights.do, 'file', load)
+            started.wait(5)
+            followers = [executor.submit(flights.do, 'file', load) for _ in range(3)]
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in (leader, *followers)]
+
+        self.assertEqual(results, ['index'] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_exception_shared(self: 'SingleFlightTest') -> None:
+        """Ошибка вычисления передается вызвавшему и не сохраняется для следующих вызовов."""
+        flights = SingleFlight()
+        with self.assertRaises(ValueError):
+            flights.do('file', mock.Mock(side_effect=ValueError))
+        self.assertEqual(flights.do('file', lambda: 'index'), 'index')
+
+    async def test_leader_timeout_does_not_fail_followers(self: 'SingleFlightTest') -> None:
+        """Таймаут первого вызова не прерывает вычисление для ожидающих вызовов."""
+        flights = SingleFlight()
+        calls = []
+
+        async def load() -> str:
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'index'
+
+        leader = asyncio.create_task(asyncio.wait_for(flights.ado('file', load), 0.01))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.ado('file', load))
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await leader
+        self.assertEqual(await follower, 'index')
+        self.assertEqual(len(calls), 1)
+
+    async def test_cancelled_work_released(self: 'SingleFlightTest') -> None:
+        """Прерванное вычисление освобождает ключ, и ожидающий вызов выполняет его заново."""
+        flights = SingleFlight()
+        calls = []
+
+        async def load() -> str:
+            calls.append(1)
+            if len(calls) == 1:
+                raise asyncio.CancelledError
+            return 'index'
+
+        self.assertEqual(await flights.ado('file', load), 'index')
+        self.assertEqual(len(calls), 2)
+
+
+class ScheduleFormatterTest(SimpleTestCase):
+    """Тесты формирования текста расписания."""
+
+    def test_group_text(self: 'ScheduleFormatterTest') -> None:
+        """Текст группы содержит время пар с учетом классного часа."""
+        index = schedule_index.build_index(make_workbook(SCHEDULE))
+
+        self.assertEqual(
+            utils.render_group_schedule(index, 'ис-21'),
+            'ИС-21\n\n'
+            '🕒 1 пара 8:00 - 9:30\n🔑 Кабинет: 101\n💼 Преподаватель: Иванов И.И.\n\n'
+            '🕒 2 пара 9:40 - 11:10\n🔑 Кабинет: Спортзал\n💼 Преподаватель: Петрова П.П.\n',
+        )
+
+    def test_commas_and_late_pairs(self: 'ScheduleFormatterTest') -> None:
+        """Запятые в ячейках сохраняются, а пары без времени выводятся без него."""
+        index = schedule_index.build_index(make_workbook({
+            '7 пара': [(301, 'ИС-21', 'Иванов, И.И.')],
+            '10 пара': [('Классный час', 'ИС-21', 'Петрова П.П.')],
+        }))
+
+        text = utils.render_group_schedule(index, 'ИС-21')
+
+        self.assertIn('🕒 7 пара\n🔑 Кабинет: 301\n💼 Преподаватель: Иванов, И.И.\n', text)
+        self.assertIn('🕒 10 пара\n🕒 🔑 Кабинет: Классный час\n', text)
+
+
+class PrewarmTest(SimpleTestCase):
+    """Тесты предварительной подготовки расписаний."""
+
+    def setUp(self: 'PrewarmTest') -> None:
+        """Подключает локальную папку с файлами на вчера и сегодня."""
+        today = timezone.localdate()
+        self.today = today.strftime('%d.%m.%Y')
+        yesterday = (today - timedelta(days=1)).strftime('%d.%m.%Y')
+        use_local_folder(self, [f'{yesterday}.xlsx', f'{self.today}.xlsx', 'Шаблон.xlsx'])
+
+    def test_upcoming_files_prewarmed(self: 'PrewarmTest') -> None:
+        """Готовятся только файлы на сегодня и позже, а тексты берутся из кэша."""
+        warmed = utils.prewarm_schedules(render=True)
+
+        self.assertEqual([file['name'] for file in warmed], [f'{self.today}.xlsx'])
+        self.assertEqual(utils.prewarm_schedules(render=True), [])
+        with mock.patch.object(utils, 'render_group_schedule') as render:
+            text = utils.service(self.today, 'пр-22')
+        self.assertIn('ПР-22', text)
+        render.assert_not_called()
+
+    def test_render_skipped_with_local_cache(self: 'PrewarmTest') -> None:
+        """С кэшем в памяти процесса команда предупреждает и не сохраняет тексты."""
+        mirror = tempfile.TemporaryDirectory()
+        self.addCleanup(mirror.cleanup)
+        stdout, stderr = StringIO(), StringIO()
+        with override_settings(SCHEDULE_USE_MIRROR=True, SCHEDULE_MIRROR_DIR=Path(mirror.name)):
+            sync_mirror()
+            call_command('prewarm_schedules', '--render', stdout=stdout, stderr=stderr)
+
+        self.assertEqual(stdout.getvalue(), f'Подготовлен файл {self.today}.xlsx\n')
+        self.assertIn('CACHE_BACKEND', stderr.getvalue())
+        with mock.patch.object(
+            utils, 'render_group_schedule', wraps=utils.render_group_schedule,
+        ) as render:
+            utils.service(self.today, 'пр-22')
+        render.assert_called_once()
+
+    def test_nothing_to_keep(self: 'PrewarmTest') -> None:
+        """Без зеркала и общего кэша команда завершается ошибкой, ничего не скачивая."""
+        with (
+            mock.patch.object(utils, 'download_file') as download,
+            self.assertRaisesMessage(CommandError, 'SCHEDULE_USE_MIRROR'),
+        ):
+            call_command('prewarm_schedules', '--render', stdout=StringIO(), stderr=StringIO())
+        download.assert_not_called()
+
+    def test_background_prewarm_on_listing_change(self: 'PrewarmTest') -> None:
+        """Фоновая подготовка запускается, только если изменился список файлов."""
+        self.addCleanup(utils._PREWARM_STATE.update, listing=None)  # noqa: SLF001
+        with (
+            override_settings(SCHEDULE_PREWARM=True),
+            mock.patch.object(utils, 'get_executor') as get_executor,
+        ):
+            for _ in range(2):
+                utils._FOLDER_LISTING.invalidate()  # noqa: SLF001
+                utils.get_filenames()
+            self.assertEqual(get_executor.return_value.submit.call_count, 1)
+
+            (settings.SCHEDULE_LOCAL_FOLDER / '31.12.2099.xlsx').write_bytes(
+                make_workbook(SCHEDULE).getvalue(),
+            )
+            utils._FOLDER_LISTING.invalidate()  # noqa: SLF001
+            utils.get_filenames()
+            self.assertEqual(get_executor.return_value.submit.call_count, 2)
+
+
+class RoomsTest(SimpleTestCase):
+    """Тесты занятости кабинетов."""
+
+    def setUp(self: 'RoomsTest') -> None:
+        """Подключает локальную папку с файлом расписания вместо Google Drive."""
+        use_local_folder(self, ['01.09.2024.xlsx'])
+
+    def test_room_schedule(self: 'RoomsTest') -> None:
+        """Для кабинета возвращаются его занятия и занятые пары."""
+        response = self.client.get('/api/rooms/', {'date': '01.09.2024', 'room': '101'})
+
+        data = response.json()
+        self.assertEqual(data['busy_pairs'], [1, 2])
+        self.assertEqual([lesson['group'] for lesson in data['lessons']], ['ИС-21', 'ПР-22'])
+
+    def test_free_rooms(self: 'RoomsTest') -> None:
+        """Свободными считаются кабинеты файла, не занятые на заданной паре."""
+        response = self.client.get('/api/rooms/free/', {'date': '01.09.2024', 'pair': '2'})
+        self.assertEqual(response.json()['rooms'], ['102', '103', '104'])
+
+        response = self.client.get('/api/rooms/free/', {'date': '01.09.2024', 'pair': '1'})
+        self.assertEqual(response.json()['rooms'], ['Спортзал'])
+
+        response = self.client.get('/api/rooms/free/', {'date': '02.09.2024', 'pair': '1'})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get('/api/rooms/free/', {'date': '01.09.2024', 'pair': '10000000'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_sheet_pair_out_of_range(self: 'RoomsTest') -> None:
+        """Лист с огромным номером пары не попадает в маску занятости."""
+        index = schedule_index.build_index(make_workbook({'99999999 пара': [(101, 'ИС-21', None)]}))
+        self.assertEqual(index.busy_pairs('101'), [])
+        self.assertEqual(index.free_rooms(1), ['101'])
+
+
+class ConditionalRequestTest(SimpleTestCase):
+    """Тесты кэша ответов и условных запросов."""
+
+    def setUp(self: 'ConditionalRequestTest') -> None:
+        """Подключает локальную папку с файлом расписания вместо Google Drive."""
+        use_local_folder(self, ['01.09.2024.xlsx'])
+
+    def test_not_modified(self: 'ConditionalRequestTest') -> None:
+        """Повторный запрос с полученным ETag возвращает 304 без тела."""
+        params = {'date': '01.09.2024', 'group': 'ис-21'}
+        response = self.client.get('/api/service/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+
+        etag = response['ETag']
+
+        response = self.client.get('/api/service/', params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(
+            '/api/service/', {**params, 'group': 'пр-22'}, HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_rendered_text_cached(self: 'ConditionalRequestTest') -> None:
+        """Текст расписания формируется один раз для версии файла и запроса."""
+        with mock.patch.object(
+            utils, 'render_teacher_schedule', wraps=utils.render_teacher_schedule,
+        ) as render:
+            first = utils.search_schedule_by_teacher('01.09.2024', 'петрова')
+            second = utils.search_schedule_by_teacher('01.09.2024', 'Петрова')
+
+        self.assertEqual(first, second)
+        self.assertEqual(render.call_count, 1)
+
+
+class EducatorSearchTest(TestCase):
+    """Тесты поиска преподавателей по фамилии."""
+
+    def setUp(self: 'EducatorSearchTest') -> None:
+        """Создает преподавателей с похожими фамилиями."""
+        Educator.objects.create(first_name='Анна', last_name='Иванова', middle_name='Петровна')
+        Educator.objects.create(first_name='Иван', last_name='Иванов', middle_name='Иванович')
+        Educator.objects.create(first_name='Петр', last_name='Петров', middle_name='Петрович')
+
+    def test_prefix_matches_ranked(self: 'EducatorSearchTest') -> None:
+        """Однофамильцы по началу фамилии возвращаются вместе, более точные первыми."""
+        self.assertEqual(
+            get_fio('иван'),
+            'Иванов Иван Иванович\nИванова Анна Петровна',
+        )
+        self.assertEqual(get_fio('Иванова'), 'Иванова Анна Петровна')
+
+    def test_typo(self: 'EducatorSearchTest') -> None:
+        """Фамилия с опечаткой находится по триграммам."""
+        self.assertEqual(get_fio('Питров'), 'Петров Петр Петрович')
+        self.assertEqual(get_fio('Сидоров'), 'Неверно введена фамилия преподавателя!')
+
+    def test_index_refreshed_on_delete(self: 'EducatorSearchTest') -> None:
+        """Индекс обновляется после удаления преподавателя."""
+        self.assertEqual(get_fio('Петров'), 'Петров Петр Петрович')
+        Educator.objects.filter(last_name='Петров').delete()
+        self.assertEqual(get_fio('Петров'), 'Неверно введена фамилия преподавателя!')
+
+    def test_index_refreshed_after_change_in_other_process(self: 'EducatorSearchTest') -> None:
+        """Индекс перестраивается, если версию списка преподавателей сменил другой процесс."""
+        self.assertEqual(get_fio('Сидоров'), 'Неверно введена фамилия преподавателя!')
+        Educator.objects.bulk_create([
+            Educator(first_name='Сидор', last_name='Сидоров', middle_name='Сидорович'),
+        ])
+        self.assertEqual(get_fio('Сидоров'), 'Неверно введена фамилия преподавателя!')
+
+        cache.set(search._VERSION_KEY, 'other-process', None)  # noqa: SLF001
+        self.assertEqual(get_fio('Сидоров'), 'Сидоров Сидор Сидорович')
+
+
+class BatchScheduleTest(SimpleTestCase):
+    """Тесты пакетного запроса расписаний."""
+
+    def setUp(self: 'BatchScheduleTest') -> None:
+        """Подключает локальную папку с файлами расписания на два дня."""
+        use_local_folder(self, ['01.09.2024.xlsx', '02.09.2024.xlsx'])
+
+    def test_date_range(self: 'BatchScheduleTest') -> None:
+        """Диапазон дат разворачивается, расписания возвращаются по каждой дате."""
+        response = self.client.get(
+            '/api/batch/',
+            {
+                'date_from': '01.09.2024',
+                'date_to': '03.09.2024',
+                'group': 'ис-21',
+                'teacher': 'петрова',
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(list(data), ['01.09.2024', '02.09.2024', '03.09.2024'])
+        self.assertEqual(data['01.09.2024']['groups']['ис-21'], service('01.09.2024', 'ис-21'))
+        self.assertIn('ПР-22', data['02.09.2024']['teachers']['петрова'])
+        self.assertEqual(data['03.09.2024']['groups']['ис-21'], 'Файл не найден.')
+
+    def test_requires_query(self: 'BatchScheduleTest') -> None:
+        """Без групп и преподавателей запрос отклоняется."""
+        response = self.client.get('/api/batch/', {'date': '01.09.2024'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_size_limited(self: 'BatchScheduleTest') -> None:
+        """Слишком длинный диапазон дат и слишком много групп отклоняются до обработки."""
+        with mock.patch('apps.bot.serializers.timedelta', wraps=timedelta) as offset:
+            response = self.client.get(
+                '/api/batch/',
+                {'date_from': '01.01.0001', 'date_to': '31.12.9999', 'group': 'ИС-21'},
+            )
+        self.assertEqual(response.status_code, 400)
+        offset.assert_not_called()
+
+        with override_settings(SCHEDULE_BATCH_MAX_QUERIES=2):
+            response = self.client.get(
+                '/api/batch/',
+                {'date': '01.09.2024', 'group': ['ИС-21', 'ИС-22'], 'teacher': 'Иванов'},
+            )
+        self.assertEqual(response.status_code, 400)
+
+
+class StructuredScheduleTest(SimpleTestCase):
+    """Тесты структурированного ответа с расписанием."""
+
+    def setUp(self: 'StructuredScheduleTest') -> None:
+        """Подключает локальную папку с файлом расписания вместо Google Drive."""
+        use_local_folder(self, ['01.09.2024.xlsx'])
+
+    def test_group_lessons(self: 'StructuredScheduleTest') -> None:
+        """Занятия группы возвращаются с номером пары и временем."""
+        response = self.client.get(
+            '/api/service/', {'date': '01.09.2024', 'group': 'ис-21', 'structured': 'true'},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['query'], 'ИС-21')
+        self.assertEqual(
+            response.json()['lessons'][0],
+            {
+                'pair': 1,
+                'title': '1 пара',
+                'start': '8:00',
+                'end': '9:30',
+                'room': '101',
+                'group': 'ИС-21',
+                'teacher': 'Иванов И.И.',
+                'class_hour': False,
+            },
+        )
+        text_response = self.client.get(
+            '/api/service/', {'date': '01.09.2024', 'group': 'ис-21'},
+        )
+        self.assertNotEqual(response['ETag'], text_response['ETag'])
+
+    def test_class_hour_times(self: 'StructuredScheduleTest') -> None:
+        """В день с классным часом используется сдвинутое время пар."""
+        response = self.client.get(
+            '/api/teachers/', {'date': '01.09.2024', 'group': 'классный', 'structured': 'true'},
+        )
+
+        lesson = response.json()['lessons'][0]
+        self.assertEqual((lesson['pair'], lesson['start'], lesson['end']), (2, '9:40', '11:10'))
+
+    def test_file_not_found(self: 'StructuredScheduleTest') -> None:
+        """Если файла на дату нет, возвращается 404."""
+        response = self.client.get(
+            '/api/service/', {'date': '02.09.2024', 'group': 'ис-21', 'structured': 'true'},
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class BenchmarksTest(SimpleTestCase):
+    """Тесты замеров производительности."""
+
+    def test_report(self: 'BenchmarksTest') -> None:
+        """Отчет содержит замеры этапов и представлений на синтетическом файле."""
+        cache.set('deployment-key', 'kept')
+        report = benchmarks.run_benchmarks('realistic', iterations=1, requests=2)
+
+        self.assertEqual(cache.get('deployment-key'), 'kept')
+
+        self.assertEqual(report['workbook']['lessons'], 6 * 60 + 1)
+        self.assertEqual(report['stages']['build_index']['runs'], 1)
+        self.assertGreater(report['stages']['build_index']['peak_kib'], 0)
+        self.assertEqual(set(report['endpoints']), {'/api/service/', '/api/teachers/'})
+        self.assertEqual(report['endpoints']['/api/service/']['runs'], 2)
+
+
+class MetricsTest(SimpleTestCase):
+    """Тесты метрик обработки расписаний."""
+
+    def setUp(self: 'MetricsTest') -> None:
+        """Подключает локальную папку и обнуляет метрики."""
+        use_local_folder(self, ['01.09.2024.xlsx'])
+        metrics.REGISTRY.reset()
+
+    def test_stages_and_caches_counted(self: 'MetricsTest') -> None:
+        """Этапы запроса замеряются, а обращения к кэшам и Drive учитываются."""
+        params = {'date': '01.09.2024', 'group': 'ис-21'}
+        self.client.get('/api/service/', params)
+        self.client.get('/api/service/', params)
+
+        registry = metrics.REGISTRY
+        self.assertEqual(registry.value('schedule_stage_duration_seconds', stage='build_index'), 1)
+        self.assertEqual(registry.value('schedule_drive_calls_total', method='get_media'), 1)
+        self.assertGreater(registry.value('schedule_drive_downloaded_bytes_total'), 0)
+        self.assertEqual(
+            registry.value('schedule_cache_requests_total', cache='response', result='hit'), 1,
+        )
+
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('# TYPE schedule_stage_duration_seconds histogram', text)
+        self.assertIn(
+            'schedule_request_duration_seconds_count{view="service"} 2', text,
+        )
+
+    @override_settings(SCHEDULE_SLOW_REQUEST_SECONDS=1e-9)
+    def test_slow_request_logged(self: 'MetricsTest') -> None:
+        """Запрос дольше порога записывается в журнал."""
+        with self.assertLogs('apps.bot.middleware', 'WARNING') as logs:
+            self.client.get('/api/async/files/')
+
+        self.assertIn('/api/async/files/', logs.output[0])
+        self.assertEqual(
+            metrics.REGISTRY.value('schedule_slow_requests_total', view='async-file-list'), 1,
+        )
+
+
+class LoadTestTest(SimpleTestCase):
+    """Тесты нагрузочного тестирования с заменителем Google Drive."""
+
+    def setUp(self: 'LoadTestTest') -> None:
+        """Подключает локальную папку с файлом расписания вместо Google Drive."""
+        self.folder = use_local_folder(self, ['01.09.2024.xlsx'])
+
+    def test_error_injection(self: 'LoadTestTest') -> None:
+        """Заменитель Google Drive завершает запросы ошибкой с заданной вероятностью."""
+        fake_drive = drive.LocalFolderDrive(self.folder, error_rate=1)
+
+        with self.assertRaises(HttpError):
+            fake_drive.files().get_media(fileId='01.09.2024.xlsx').execute()
+
+    def test_checksum_reused_until_file_changes(self: 'LoadTestTest') -> None:
+        """Заменитель Google Drive пересчитывает md5 файла только после его изменения."""
+        fake_drive = drive.LocalFolderDrive(self.folder)
+        path = self.folder / '01.09.2024.xlsx'
+
+        with mock.patch.object(drive.hashlib, 'md5', wraps=hashlib.md5) as md5:
+            first = fake_drive.files().list().execute()['files'][0]['md5Checksum']
+            fake_drive.files().list().execute()
+            self.assertEqual(md5.call_count, 1)
+
+            path.write_bytes(make_workbook({'1 пара': [(101, 'ИС-21', None)]}).getvalue())
+            second = fake_drive.files().list().execute()['files'][0]['md5Checksum']
+        self.assertEqual(md5.call_count, 2)
+        self.assertNotEqual(first, second)
+
+    def test_report_per_endpoint(self: 'LoadTestTest') -> None:
+        """Отчет содержит число запросов, статусы и перцентили для каждого представления."""
+        requests = [
+            ('/api/service/', {'date': '01.09.2024', 'group': 'ИС-21'}),
+            ('/api/teachers/', {'date': '01.09.2024', 'group': 'Иванов'}),
+            ('/api/service/', {'date': '01.09.2024'}),
+        ]
+
+        report = loadtest.run_load(loadtest.client_sender(), requests, concurrency=2)
+
+        service_report = report['endpoints']['/api/service/']
+        self.assertEqual(service_report['requests'], 2)
+        self.assertEqual(service_report['statuses'], {'200': 1, '400': 1})
+        self.assertEqual(service_report['errors'], 1)
+        self.assertEqual(report['endpoints']['/api/teachers/']['statuses'], {'200': 1})
+
+    def test_command_keeps_deployment_cache(self: 'LoadTestTest') -> None:
+        """Нагрузочный тест в этом же процессе не очищает кэш развертывания."""
+        cache.set('deployment-key', 'kept')
+        call_command(
+            'load_schedules', '--date', '01.09.2024', '--requests', '4', stdout=StringIO(),
+        )
+        self.assertEqual(cache.get('deployment-key'), 'kept')
@@ -2,11 +2,32 @@
 
 from django.urls import path
 
-from apps.bot.views import FileListView, FioView, ScheduleTeacherView, ServiceView
+from apps.bot.views import (
+    AsyncFileListView,
+    AsyncScheduleTeacherView,
+    AsyncServiceView,
+    BatchScheduleView,
+    FileListView,
+    FioView,
+    FreeRoomsView,
+    MetricsView,
+    RoomScheduleView,
+    ScheduleChangesView,
+    ScheduleTeacherView,
+    ServiceView,
+)
 
 urlpatterns = [
+    path('async/files/', AsyncFileListView.as_view(), name='async-file-list'),
+    path('async/service/', AsyncServiceView.as_view(), name='async-service'),
+    path('async/teachers/', AsyncScheduleTeacherView.as_view(), name='async-teacher'),
+    path('batch/', BatchScheduleView.as_view(), name='batch'),
+    path('changes/', ScheduleChangesView.as_view(), name='changes'),
     path('files/', FileListView.as_view(), name='file-list'),
     path('fio/', FioView.as_view(), name='fio'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('rooms/', RoomScheduleView.as_view(), name='room'),
+    path('rooms/free/', FreeRoomsView.as_view(), name='free-rooms'),
     path('service/', ServiceView.as_view(), name='service'),
     path('teachers/', ScheduleTeacherView.as_view(), name='teacher'),
 ]
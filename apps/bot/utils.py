@@ -1,14 +1,35 @@
 """Модуль disk.py для работы с excel файлами с google drive."""
 
+import logging
+from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
 from typing import Any
 
-import openpyxl
 from django.conf import settings
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-
-from apps.bot.models import Educator
+from django.utils import timezone
+
+from apps.bot.caching import arender_cached, etag_for, last_modified_for, render_cached
+from apps.bot.concurrency import get_executor, run_cpu, run_io
+from apps.bot.content_cache import get_content_cache
+from apps.bot.drive import get_drive_service, list_files
+from apps.bot.listing import FolderListing
+from apps.bot.metrics import count_cache, increment, timed
+from apps.bot.mirror import get_mirror
+from apps.bot.schedule_index import (
+    GroupLesson,
+    LessonRecord,
+    ScheduleIndex,
+    TeacherLesson,
+    build_index,
+    cached_index,
+    format_cell,
+    pair_number,
+    store_index,
+)
+from apps.bot.search import search_educators
+from apps.bot.singleflight import SingleFlight
+from apps.bot.snapshot import load_snapshot, source_key, write_snapshot
 
 _EXTENDED_TIME_MAPPING = {
     1: '8:00 - 9:30',
@@ -21,7 +42,7 @@ _EXTENDED_TIME_MAPPING = {
 
 _FOLDER_ID = '19yyXXullGGMIT3XISiZ33wkDxHJy0zvb'
 
-_SCOPES = ['https://www.googleapis.com/auth/drive']
+LOGGER = logging.getLogger(__name__)
 
 _TIME_MAPPING = {
     1: '8:00 - 9:30',
@@ -34,191 +55,564 @@ _TIME_MAPPING = {
 }
 
 
-def get_credentials() -> Credentials:
-    """Возвращает учетные данные из файла учетной записи службы с заданными областями."""
-    service_account_file = settings.BASE_DIR / 'apps' / 'bot' / 'data' / settings.API_ACCOUNT
-    return Credentials.from_service_account_file(
-        service_account_file,
-        scopes=_SCOPES,
-    )
+# Файлы и версии из последнего списка, по которому запускалась фоновая подготовка.
+_PREWARM_STATE: dict[str, frozenset | None] = {'listing': None}
+
+
+@timed('list_folder')
+def _list_folder() -> list[dict]:
+    """Получает список файлов папки из локального зеркала или с Google Drive."""
+    if settings.SCHEDULE_USE_MIRROR:
+        files = get_mirror(settings.SCHEDULE_MIRROR_DIR).files()
+    else:
+        files = list_files(_FOLDER_ID)
+    if settings.SCHEDULE_PREWARM:
+        listing = frozenset((file['id'], file.get('modifiedTime', '')) for file in files)
+        if listing != _PREWARM_STATE['listing']:
+            _PREWARM_STATE['listing'] = listing
+            get_executor('prewarm', 1).submit(_prewarm_in_background, files)
+    return files
+
 
+_FOLDER_LISTING = FolderListing(_list_folder, lambda: settings.SCHEDULE_LISTING_TTL)
 
+_INDEX_FLIGHTS: SingleFlight[ScheduleIndex] = SingleFlight()
+
+
+@timed('get_filenames')
 def get_filenames() -> list[dict]:
     """Получает список файлов с Google Drive."""
-    drive_service = build('drive', 'v3', credentials=get_credentials())
-
-    results = (
-        drive_service.files()
-        .list(
-            q=f"'{_FOLDER_ID}' in parents",
-            fields='nextPageToken, files(id, name)',
-        )
-        .execute()
-    )
+    return _FOLDER_LISTING.files()
 
-    return results.get('files', [])
 
+@timed('find_file')
+def find_file(name: str) -> dict | None:
+    """Возвращает файл расписания на заданную дату или None, если файла нет."""
+    return _FOLDER_LISTING.get(name + '.xlsx')
 
+
+@timed('download_file')
 def download_file(file_id: str, drive_service: Any) -> BytesIO:
     """Скачивает файл с Google Drive."""
     request = drive_service.files().get_media(fileId=file_id)
-    return BytesIO(request.execute())
+    content = request.execute()
+    increment('schedule_drive_calls_total', method='get_media')
+    increment('schedule_drive_downloaded_bytes_total', len(content))
+    return BytesIO(content)
+
+
+def load_file_content(file: dict) -> BytesIO:
+    """Возвращает содержимое файла расписания.
+
+    Если включено локальное зеркало и в нем есть нужная версия файла, файл читается
+    из зеркала без копии в памяти. Иначе содержимое берется из кэша скачанных файлов,
+    а Google Drive используется только когда файла нет и там.
+    """
+    if settings.SCHEDULE_USE_MIRROR:
+        file_content = get_mirror(settings.SCHEDULE_MIRROR_DIR).read(file)
+        if file_content is not None:
+            return file_content
+
+    content_cache = get_content_cache(
+        settings.SCHEDULE_CONTENT_CACHE_BYTES,
+        settings.SCHEDULE_CONTENT_SPILL_DIR,
+        settings.SCHEDULE_CONTENT_SPILL_BYTES,
+    )
+    key = (file['id'], file.get('modifiedTime', ''))
+    content = content_cache.get(key)
+    if content is not None:
+        return BytesIO(content)
+
+    file_content = download_file(file['id'], get_drive_service())
+    content_cache.put(key, file_content.getvalue())
+    return file_content
+
+
+def get_schedule_index(file: dict) -> ScheduleIndex:
+    """Возвращает индекс расписания для файла, скачивая его только при первом обращении.
+
+    Одновременные запросы к еще не разобранному файлу ждут одно общее скачивание и разбор.
+    """
+    version = file.get('modifiedTime', '')
+    index = cached_index(file['id'], version)
+    count_cache('index', hit=index is not None)
+    if index is not None:
+        return index
+
+    return _INDEX_FLIGHTS.do((file['id'], version), lambda: _build_schedule_index(file, version))
+
+
+def _build_schedule_index(file: dict, version: str) -> ScheduleIndex:
+    """Загружает индекс из снимка или разбирает файл, сохраняя индекс в памяти."""
+    index = cached_index(file['id'], version)
+    if index is None:
+        index = read_index_snapshot(file)
+        if index is None:
+            index = build_index(load_file_content(file))
+            save_index_snapshot(file, index)
+        store_index(file['id'], version, index)
+    return index
+
+
+def read_index_snapshot(file: dict) -> ScheduleIndex | None:
+    """Загружает индекс файла из снимка в локальном зеркале, если снимок актуален."""
+    if not settings.SCHEDULE_USE_MIRROR:
+        return None
+    with timed('read_snapshot'):
+        path = get_mirror(settings.SCHEDULE_MIRROR_DIR).snapshot_path_for(file['id'])
+        return load_snapshot(path, source_key(file))
+
+
+def save_index_snapshot(file: dict, index: ScheduleIndex) -> None:
+    """Сохраняет снимок индекса рядом с копией файла в локальном зеркале."""
+    if not settings.SCHEDULE_USE_MIRROR:
+        return
+    mirror = get_mirror(settings.SCHEDULE_MIRROR_DIR)
+    try:
+        write_snapshot(mirror.snapshot_path_for(file['id']), index, source_key(file))
+    except OSError:
+        LOGGER.exception('Не удалось сохранить снимок индекса файла %s', file['name'])
 
 
-def process_excel(file_content: BytesIO, group_name: str) -> list[tuple[str, str | int, str, bool]]:
-    """Обрабатывает содержимое Excel файла, возвращая список данных для заданной группы."""
-    wb = openpyxl.load_workbook(file_content)
-    results = []
+def sync_mirror() -> list[dict]:
+    """Синхронизирует локальное зеркало с папкой на Google Drive."""
+    drive_service = get_drive_service()
+    return get_mirror(settings.SCHEDULE_MIRROR_DIR).sync(
+        list_files(_FOLDER_ID),
+        lambda file_id: download_file(file_id, drive_service).getvalue(),
+    )
 
-    for sheet in wb.worksheets:
-        for row in sheet.iter_rows(min_row=2, values_only=True):
 
-            class_hour = 'Классный час' in row
-            for idx in range(1, len(row), 3):
+def upcoming_files(files: list[dict]) -> list[dict]:
+    """Возвращает файлы расписания на сегодня и последующие дни."""
+    today = timezone.localdate()
+    upcoming = []
+    for file in files:
+        try:
+            day = datetime.strptime(  # noqa: DTZ007
+                file['name'].removesuffix('.xlsx'), settings.SCHEDULE_FILE_DATE_FORMAT,
+            ).date()
+        except ValueError:
+            continue
+        if day >= today:
+            upcoming.append(file)
+    return upcoming
+
+
+def prerender_schedules(file: dict, index: ScheduleIndex) -> None:
+    """Формирует и сохраняет в кэш тексты расписаний всех групп и преподавателей файла."""
+    name = file['name'].removesuffix('.xlsx')
+    for group in index.groups:
+        service(name, group)
+    for teacher_name in index.teachers:
+        search_schedule_by_teacher(name, teacher_name)
+
+
+def prewarm_files(files: list[dict], *, render: bool = False) -> list[dict]:
+    """Заранее скачивает и разбирает файлы на сегодня и последующие дни.
+
+    Файлы, индекс текущей версии которых уже построен, пропускаются. При render тексты
+    расписаний всех групп и преподавателей сразу сохраняются в кэш ответов.
+    Возвращает список подготовленных файлов.
+    """
+    warmed = []
+    for file in upcoming_files(files):
+        if cached_index(file['id'], file.get('modifiedTime', '')) is not None:
+            continue
+        with timed('prewarm'):
+            index = get_schedule_index(file)
+            if render:
+                prerender_schedules(file, index)
+        warmed.append(file)
+    return warmed
+
+
+def _prewarm_in_background(files: list[dict]) -> None:
+    """Подготавливает новые файлы в фоновом потоке, записывая ошибки в журнал."""
+    try:
+        prewarm_files(files, render=settings.SCHEDULE_PREWARM_RENDER)
+    except Exception:
+        LOGGER.exception('Ошибка предварительной подготовки расписаний')
 
-                if row[idx] == group_name:
 
-                    room_number = row[idx - 1]
-                    teacher_name = row[idx + 1]
-                    results.append((sheet.title, room_number, teacher_name, class_hour))
+def prewarm_schedules(*, render: bool = False) -> list[dict]:
+    """Перечитывает папку и заранее подготавливает новые файлы расписания."""
+    _FOLDER_LISTING.invalidate()
+    return prewarm_files(get_filenames(), render=render)
 
-    return results
 
+def process_excel(file_content: BytesIO, group_name: str) -> list[GroupLesson]:
+    """Обрабатывает содержимое Excel файла, возвращая список данных для заданной группы."""
+    return [lesson.as_group_lesson() for lesson in build_index(file_content).for_group(group_name)]
 
-def process_excel2(
-    file_content: BytesIO, teacher_name: str,
 
-) -> list[tuple[str, str | int, str, str, bool]]:
+def process_excel2(file_content: BytesIO, teacher_name: str) -> list[TeacherLesson]:
     """Обрабатывает содержимое Excel файла, возвращая список данных для заданного преподавателя."""
-    wb = openpyxl.load_workbook(file_content)
-    results = []
-    teacher_last_name = teacher_name.strip().lower()
+    return [
+        lesson.as_teacher_lesson() for lesson in build_index(file_content).for_teacher(teacher_name)
+    ]
+
 
-    for sheet in wb.worksheets:
-        for row in sheet.iter_rows(min_row=2, values_only=True):
+_CLASS_HOUR = 'Классный час'
 
-            class_hour = 'Классный час' in row
-            for idx in range(2, len(row), 3):
-                if row[idx] and row[idx].strip().lower().startswith(teacher_last_name):
+_DETAIL_TEMPLATES = {
+    'group': ('🔑 Кабинет: {room}', '💼 Преподаватель: {teacher}'),
+    'teacher': ('🔑 Кабинет: {room}', '💼 Группа: {group}'),
+}
+
+_TIME_STRINGS = {
+    class_hour_day: {
+        pair: f' {time_range}'
+        for pair, time_range in (
+            _EXTENDED_TIME_MAPPING if class_hour_day else _TIME_MAPPING
+        ).items()
+    }
+    for class_hour_day in (False, True)
+}
 
-                    room_number = row[idx - 2]
-                    group_name = row[idx - 1]
-                    full_teacher_name = row[idx]
 
-                    results.append(
-                        (sheet.title, room_number, group_name, full_teacher_name, class_hour),
-                    )
+@lru_cache(maxsize=256)
+def _title_line(sheet_title: str, *, class_hour_day: bool) -> str:
+    """Возвращает строку с названием листа и временем пары."""
+    pair = pair_number(sheet_title)
+    if pair is None:
+        return _mark_class_hour(sheet_title)
+    return f'🕒 {sheet_title}{_TIME_STRINGS[class_hour_day].get(pair, "")}'
 
-    return results
 
+def _mark_class_hour(line: str) -> str:
+    """Отмечает строку с классным часом значком времени."""
+    return f'🕒 {line}' if _CLASS_HOUR in line else line
 
+
+@timed('form_schedule')
 def form_schedule(schedule: str) -> str:
     """Формирует текст расписания, добавляя к каждому занятию время его проведения."""
     schedule_text = schedule.split('\n')
-    class_hour_day = any('Классный час' in line for line in schedule_text)
+    class_hour_day = any(_CLASS_HOUR in line for line in schedule_text)
 
     for i, line in enumerate(schedule_text):
-        schedule_text_str = ''
-
         if line.strip() and line[0].isdigit():
-            pair_number = int(line[0])
+            schedule_text[i] = _title_line(line, class_hour_day=class_hour_day)
+        else:
+            schedule_text[i] = _mark_class_hour(line)
 
-            if class_hour_day and pair_number in _TIME_MAPPING:
-                schedule_text_str = (
-                    '🕒 ' + schedule_text[i] + f' {_EXTENDED_TIME_MAPPING[pair_number]}'
-                )
+    return '\n'.join(schedule_text)
 
-            elif pair_number in _TIME_MAPPING:
-                schedule_text_str = '🕒 ' + schedule_text[i] + f' {_TIME_MAPPING[pair_number]}'
-            schedule_text[i] = schedule_text_str
 
-        elif 'Классный час' in line:
-            schedule_text[i] = '🕒 ' + line
+def render_lessons(header: str, lessons: list[LessonRecord], kind: str) -> str:
+    """Формирует текст расписания из занятий за один проход.
+
+    kind - 'group' или 'teacher' - выбирает, кто указывается в занятии: преподаватель
+    или группа. Время пар берется из заранее подготовленных строк.
+    """
+    class_hour_day = is_class_hour_day(lessons)
+    templates = _DETAIL_TEMPLATES[kind]
+    parts = [header, '']
+    for lesson in lessons:
+        values = {
+            'room': format_cell(lesson.room),
+            'group': lesson.group or '',
+            'teacher': lesson.teacher or '',
+        }
+        parts.append(_title_line(lesson.sheet_title, class_hour_day=class_hour_day))
+        parts.extend(_mark_class_hour(template.format_map(values)) for template in templates)
+        parts.append('')
+    return '\n'.join(parts)
+
+
+@timed('render_group')
+def render_group_schedule(index: ScheduleIndex, group: str) -> str:
+    """Формирует текст расписания группы по индексу файла."""
+    group_name = group_query(group)
+    results = index.for_group(group_name)
 
-    return '\n'.join(schedule_text)
+    if not results:
+        return 'Неправильно введен номер группы или занятий нет.'
 
+    return render_lessons(group_name, results, 'group')
 
-def service(name: str, group: str) -> str:
-    """Предоставляет расписание для заданной группы."""
-    files = get_filenames()
 
-    chosen_file_name = name
-    chosen_file = None
-    for file in files:
-        if file['name'] == chosen_file_name + '.xlsx':
-            chosen_file = file
-            break
+@timed('render_teacher')
+def render_teacher_schedule(index: ScheduleIndex, teacher_name: str) -> str:
+    """Формирует текст расписания преподавателя по индексу файла."""
+    results = index.for_teacher(teacher_name)
+
+    if not results:
+        return 'Неправильно введены данные или занятий нет.'
+
+    return render_lessons(teacher_query(teacher_name), results, 'teacher')
+
+
+def is_class_hour_day(lessons: list[LessonRecord]) -> bool:
+    """Проверяет, есть ли среди занятий классный час, сдвигающий время пар."""
+    return any(
+        _CLASS_HOUR in str(value)
+        for lesson in lessons
+        for value in (lesson.sheet_title, lesson.room, lesson.group, lesson.teacher)
+    )
+
+
+def lesson_times(
+    pair: int | None, *, class_hour_day: bool,
+) -> tuple[str | None, str | None]:
+    """Возвращает время начала и окончания пары с учетом классного часа."""
+    time_mapping = _EXTENDED_TIME_MAPPING if class_hour_day else _TIME_MAPPING
+    if pair not in time_mapping:
+        return None, None
+    start, end = time_mapping[pair].split(' - ')
+    return start, end
+
+
+def structure_lessons(lessons: list[LessonRecord]) -> list[dict]:
+    """Возвращает занятия в виде словарей для структурированного ответа."""
+    class_hour_day = is_class_hour_day(lessons)
+    structured = []
+    for lesson in lessons:
+        pair = pair_number(lesson.sheet_title)
+        start, end = lesson_times(pair, class_hour_day=class_hour_day)
+        structured.append({
+            'pair': pair,
+            'title': lesson.sheet_title,
+            'start': start,
+            'end': end,
+            'room': format_cell(lesson.room),
+            'group': lesson.group,
+            'teacher': lesson.teacher,
+            'class_hour': lesson.class_hour,
+        })
+    return structured
+
+
+def structured_service(name: str, group: str) -> dict | None:
+    """Предоставляет занятия заданной группы или None, если файла на дату нет."""
+    chosen_file = find_file(name)
 
     if chosen_file is None:
-        return 'Файл не найден.'
+        return None
 
-    group_name = group.upper()
+    group_name = group_query(group)
+    lessons = get_schedule_index(chosen_file).for_group(group_name)
+    return {'date': name, 'query': group_name, 'lessons': structure_lessons(lessons)}
 
-    drive_service = build('drive', 'v3', credentials=get_credentials())
 
-    file_content = download_file(chosen_file['id'], drive_service)
+def structured_search_schedule_by_teacher(name: str, teacher_name: str) -> dict | None:
+    """Предоставляет занятия заданного преподавателя или None, если файла на дату нет."""
+    chosen_file = find_file(name)
 
-    results = process_excel(file_content, group_name)
+    if chosen_file is None:
+        return None
 
-    if not results:
-        return 'Неправильно введен номер группы или занятий нет.'
+    lessons = get_schedule_index(chosen_file).for_teacher(teacher_name)
+    return {
+        'date': name,
+        'query': teacher_query(teacher_name),
+        'lessons': structure_lessons(lessons),
+    }
+
+
+def room_schedule(name: str, room: str) -> dict | None:
+    """Предоставляет занятия в заданном кабинете или None, если файла на дату нет."""
+    chosen_file = find_file(name)
+
+    if chosen_file is None:
+        return None
 
-    message = []
-    for sheet_title, room_number_value, teacher_name, _class_hour in results:
+    index = get_schedule_index(chosen_file)
+    return {
+        'date': name,
+        'query': format_cell(room),
+        'lessons': structure_lessons(index.for_room(room)),
+        'busy_pairs': index.busy_pairs(room),
+    }
 
-        room_number = room_number_value
-        if isinstance(room_number, float):
 
-            room_number = int(room_number)
-        message.append(
-            f'\n{sheet_title},🔑 Кабинет: {room_number},💼 Преподаватель: {teacher_name}\n',
-        )
-    message2 = f'{group_name.upper()}\n' + ''.join(message).replace(',', '\n')
+def free_rooms(name: str, pair: int) -> dict | None:
+    """Предоставляет кабинеты, свободные на заданной паре, или None, если файла на дату нет.
 
-    return form_schedule(message2)
+    Учитываются кабинеты, встречающиеся в файле на эту дату.
+    """
+    chosen_file = find_file(name)
+
+    if chosen_file is None:
+        return None
+
+    return {'date': name, 'pair': pair, 'rooms': get_schedule_index(chosen_file).free_rooms(pair)}
+
+
+def schedule_validators(
+    kind: str, name: str, query: str, *, structured: bool = False,
+) -> tuple[str, int | None] | None:
+    """Возвращает ETag и время изменения ответа на запрос расписания.
+
+    kind - 'group' или 'teacher', query - имя группы или преподавателя из запроса,
+    structured - запрошен ли структурированный ответ вместо текста.
+    Если файла на заданную дату нет, возвращает None.
+    """
+    chosen_file = find_file(name)
+    if chosen_file is None:
+        return None
+    normalized = group_query(query) if kind == 'group' else teacher_query(query)
+    variant = f'{kind}:structured' if structured else kind
+    return etag_for(variant, chosen_file, normalized), last_modified_for(chosen_file)
+
+
+def group_query(group: str) -> str:
+    """Нормализует имя группы так же, как при поиске занятий."""
+    return group.upper()
+
+
+def teacher_query(teacher_name: str) -> str:
+    """Нормализует имя преподавателя так же, как при формировании текста расписания."""
+    return teacher_name.capitalize()
+
+
+def service(name: str, group: str) -> str:
+    """Предоставляет расписание для заданной группы."""
+    chosen_file = find_file(name)
+
+    if chosen_file is None:
+        return 'Файл не найден.'
+
+    return render_cached(
+        'group',
+        chosen_file,
+        group_query(group),
+        lambda: render_group_schedule(get_schedule_index(chosen_file), group),
+    )
 
 
 def search_schedule_by_teacher(name: str, teacher_name: str) -> str:
     """Предоставляет расписание для заданного преподавателя."""
-    files = get_filenames()
-    chosen_file_name = name
-    chosen_file = None
+    chosen_file = find_file(name)
 
-    for file in files:
-        if file['name'] == chosen_file_name + '.xlsx':
-            chosen_file = file
-            break
+    if chosen_file is None:
+        return 'Файл не найден.'
+
+    return render_cached(
+        'teacher',
+        chosen_file,
+        teacher_query(teacher_name),
+        lambda: render_teacher_schedule(get_schedule_index(chosen_file), teacher_name),
+    )
+
+
+def _schedules_for_date(name: str, groups: list[str], teachers: list[str]) -> dict:
+    """Предоставляет расписания заданных групп и преподавателей на одну дату."""
+    return {
+        'groups': {group: service(name, group) for group in groups},
+        'teachers': {
+            teacher_name: search_schedule_by_teacher(name, teacher_name)
+            for teacher_name in teachers
+        },
+    }
+
+
+def batch_schedule(dates: list[str], groups: list[str], teachers: list[str]) -> dict[str, dict]:
+    """Предоставляет расписания групп и преподавателей на несколько дат.
+
+    Файлы разных дат скачиваются и разбираются параллельно в пуле потоков, а все запросы
+    к одной дате используют один индекс файла.
+    """
+    executor = get_executor('batch', settings.SCHEDULE_BATCH_WORKERS)
+    futures = {
+        name: executor.submit(_schedules_for_date, name, groups, teachers) for name in dates
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+async def aget_filenames() -> list[dict]:
+    """Асинхронно получает список файлов с Google Drive."""
+    return await run_io(get_filenames)
+
+
+async def _abuild_schedule_index(file: dict, version: str) -> ScheduleIndex:
+    """Асинхронно скачивает и разбирает файл, сохраняя его индекс."""
+    index = cached_index(file['id'], version)
+    if index is None:
+        index = await run_io(read_index_snapshot, file)
+        if index is None:
+            file_content = await run_io(load_file_content, file)
+            index = await run_cpu(build_index, file_content)
+            await run_io(save_index_snapshot, file, index)
+        store_index(file['id'], version, index)
+    return index
+
+
+async def aget_schedule_index(file: dict) -> ScheduleIndex:
+    """Асинхронно возвращает индекс расписания для файла.
+
+    Скачивание выполняется в пуле потоков ввода-вывода, а разбор файла - в ограниченном
+    пуле потоков разбора, чтобы не блокировать цикл событий. Одновременные запросы
+    (в том числе синхронные) к одному файлу ждут одно общее скачивание и разбор.
+    """
+    version = file.get('modifiedTime', '')
+    index = cached_index(file['id'], version)
+    count_cache('index', hit=index is not None)
+    if index is not None:
+        return index
+
+    return await _INDEX_FLIGHTS.ado(
+        (file['id'], version), lambda: _abuild_schedule_index(file, version),
+    )
+
+
+async def aservice(name: str, group: str) -> str:
+    """Асинхронно предоставляет расписание для заданной группы."""
+    chosen_file = await run_io(find_file, name)
 
     if chosen_file is None:
         return 'Файл не найден.'
 
-    drive_service = build('drive', 'v3', credentials=get_credentials())
+    async def render() -> str:
+        return render_group_schedule(await aget_schedule_index(chosen_file), group)
 
-    file_content = download_file(chosen_file['id'], drive_service)
-    results = process_excel2(file_content, teacher_name)
+    return await arender_cached('group', chosen_file, group_query(group), render)
 
-    if not results:
-        return 'Неправильно введены данные или занятий нет.'
 
-    message = []
-    for sheet_title, room_number_value, group_name, _full_teacher_name, _class_hour in results:
+async def asearch_schedule_by_teacher(name: str, teacher_name: str) -> str:
+    """Асинхронно предоставляет расписание для заданного преподавателя."""
+    chosen_file = await run_io(find_file, name)
+
+    if chosen_file is None:
+        return 'Файл не найден.'
 
-        room_number = room_number_value
-        if isinstance(room_number, float):
+    async def render() -> str:
+        return render_teacher_schedule(await aget_schedule_index(chosen_file), teacher_name)
 
-            room_number = int(room_number)
-        message.append(f'\n{sheet_title},🔑 Кабинет: {room_number},💼 Группа: {group_name}\n')
-    message2 = f'{teacher_name.capitalize()}\n' + ''.join(message).replace(',', '\n')
+    return await arender_cached('teacher', chosen_file, teacher_query(teacher_name), render)
 
-    return form_schedule(message2)
+
+async def astructured_service(name: str, group: str) -> dict | None:
+    """Асинхронно предоставляет занятия заданной группы или None, если файла на дату нет."""
+    chosen_file = await run_io(find_file, name)
+
+    if chosen_file is None:
+        return None
+
+    group_name = group_query(group)
+    lessons = (await aget_schedule_index(chosen_file)).for_group(group_name)
+    return {'date': name, 'query': group_name, 'lessons': structure_lessons(lessons)}
+
+
+async def astructured_search_schedule_by_teacher(name: str, teacher_name: str) -> dict | None:
+    """Асинхронно предоставляет занятия заданного преподавателя или None, если файла нет."""
+    chosen_file = await run_io(find_file, name)
+
+    if chosen_file is None:
+        return None
+
+    lessons = (await aget_schedule_index(chosen_file)).for_teacher(teacher_name)
+    return {
+        'date': name,
+        'query': teacher_query(teacher_name),
+        'lessons': structure_lessons(lessons),
+    }
 
 
 def get_fio(value: str) -> str:
     """Предоставляет ФИО для заданной пользователем фамилии преподавателя."""
-    try:
-        educator = Educator.objects.get(last_name__icontains=value.capitalize())
-    except Educator.DoesNotExist:
+    matches = search_educators(value)
+    if not matches:
         return 'Неверно введена фамилия преподавателя!'
-    else:
-        return f'{educator.last_name} {educator.first_name} {educator.middle_name}'
-
+    return '\n'.join(matches)
@@ -1,30 +1,159 @@
 """Представления для приложения bot."""
 
+import asyncio
+import functools
 import logging
+from collections.abc import Awaitable, Callable
 
 from django.core.exceptions import ValidationError
+from django.http import HttpRequest, HttpResponse, HttpResponseBase, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.bot.serializers import FioSerializer, ScheduleRequestSerializer, ScheduleTeacherSeriaizer
-from apps.bot.utils import get_filenames, get_fio, search_schedule_by_teacher, service
+from apps.bot.changes import schedule_changes
+from apps.bot.concurrency import limited, run_io
+from apps.bot.metrics import REGISTRY
+from apps.bot.serializers import (
+    BatchScheduleSerializer,
+    ChangesRequestSerializer,
+    FioSerializer,
+    FreeRoomsRequestSerializer,
+    FreeRoomsSerializer,
+    RoomRequestSerializer,
+    RoomScheduleSerializer,
+    ScheduleChangesSerializer,
+    ScheduleRequestSerializer,
+    ScheduleTeacherSeriaizer,
+    StructuredScheduleSerializer,
+)
+from apps.bot.utils import (
+    aget_filenames,
+    asearch_schedule_by_teacher,
+    aservice,
+    astructured_search_schedule_by_teacher,
+    astructured_service,
+    batch_schedule,
+    free_rooms,
+    get_filenames,
+    get_fio,
+    room_schedule,
+    schedule_validators,
+    search_schedule_by_teacher,
+    service,
+    structured_search_schedule_by_teacher,
+    structured_service,
+)
 
 LOGGER = logging.getLogger(__name__)
 
 
+def _json_response(data: object, status_code: int = status.HTTP_200_OK) -> JsonResponse:
+    """Возвращает JSON ответ в том же виде, что и ответы APIView."""
+    return JsonResponse(
+        data, status=status_code, safe=False, json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def _set_validators(
+    response: HttpResponseBase,
+    validators: tuple[str, int | None] | None,
+) -> HttpResponseBase:
+    """Добавляет к ответу заголовки ETag и Last-Modified."""
+    if validators is not None:
+        etag, last_modified = validators
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _not_modified(
+    request: HttpRequest | Request,
+    validators: tuple[str, int | None] | None,
+) -> HttpResponse | None:
+    """Возвращает ответ 304, если у клиента уже есть актуальная версия расписания."""
+    if validators is None:
+        return None
+    etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        _set_validators(response, validators)
+    return response
+
+
+def _structured_response(
+    data: dict | None,
+    validators: tuple[str, int | None] | None,
+) -> HttpResponseBase:
+    """Возвращает структурированное расписание или 404, если файла на дату нет."""
+    if data is None:
+        return Response({'error': 'Файл не найден.'}, status=status.HTTP_404_NOT_FOUND)
+    return _set_validators(
+        Response(StructuredScheduleSerializer(data).data, status=status.HTTP_200_OK),
+        validators,
+    )
+
+
+def _structured_json_response(
+    data: dict | None,
+    validators: tuple[str, int | None] | None,
+) -> HttpResponseBase:
+    """Возвращает структурированное расписание для асинхронных представлений."""
+    if data is None:
+        return _json_response({'error': 'Файл не найден.'}, status.HTTP_404_NOT_FOUND)
+    return _set_validators(_json_response(StructuredScheduleSerializer(data).data), validators)
+
+
+async def _aschedule_response(
+    request: HttpRequest,
+    kind: str,
+    name: str,
+    query: str,
+    *,
+    render: Callable[[str, str], Awaitable[str]],
+    structure: Callable[[str, str], Awaitable[dict | None]] | None,
+) -> HttpResponseBase:
+    """Формирует ответ асинхронного представления расписания.
+
+    Вызывается целиком внутри limited(), чтобы поиск файла для ETag тоже учитывался в
+    таймауте и ограничении числа одновременных запросов. Если передан structure,
+    возвращается структурированное расписание вместо текста.
+    """
+    validators = await run_io(functools.partial(
+        schedule_validators, kind, name, query, structured=structure is not None,
+    ))
+    response = _not_modified(request, validators)
+    if response is None and structure is not None:
+        response = _structured_json_response(await structure(name, query), validators)
+    if response is None:
+        response = _set_validators(_json_response(await render(name, query)), validators)
+    return response
+
+
 class ServiceView(APIView):
     """Представление для обработки запросов на получение расписания по группе."""
 
     @staticmethod
-    def get(request: Request) -> Response:
+    def get(request: Request) -> HttpResponseBase:
         """Обрабатывает GET-запросы с датой и именем группы, возвращая расписание."""
         serializer = ScheduleRequestSerializer(data=request.query_params)
         if serializer.is_valid():
             name = serializer.validated_data['date']
             group = serializer.validated_data['group']
+            structured = serializer.validated_data['structured']
             try:
+                validators = schedule_validators('group', name, group, structured=structured)
+                response = _not_modified(request, validators)
+                if response is None and structured:
+                    response = _structured_response(structured_service(name, group), validators)
+                if response is not None:
+                    return response
+
                 result = service(name, group)
                 if result is None:
                     return Response(
@@ -32,7 +161,7 @@ class ServiceView(APIView):
                         status=status.HTTP_204_NO_CONTENT,
                     )
 
-                return Response(result, status=status.HTTP_200_OK)
+                return _set_validators(Response(result, status=status.HTTP_200_OK), validators)
 
             except ValidationError as e:
                 LOGGER.exception('Ошибка в функции service')
@@ -54,20 +183,32 @@ class ScheduleTeacherView(APIView):
     """Представление для обработки запросов на получение расписания по преподавателю."""
 
     @staticmethod
-    def get(request: Request) -> Response:
+    def get(request: Request) -> HttpResponseBase:
         """Обрабатывает GET-запросы с датой и именем преподавателя, возвращая расписание."""
         serializer = ScheduleTeacherSeriaizer(data=request.query_params)
         if serializer.is_valid():
             date = serializer.validated_data['date']
             teachers_name = serializer.validated_data['group']
+            structured = serializer.validated_data['structured']
             try:
+                validators = schedule_validators(
+                    'teacher', date, teachers_name, structured=structured,
+                )
+                response = _not_modified(request, validators)
+                if response is None and structured:
+                    response = _structured_response(
+                        structured_search_schedule_by_teacher(date, teachers_name), validators,
+                    )
+                if response is not None:
+                    return response
+
                 result = search_schedule_by_teacher(date, teachers_name)
                 if result is None:
                     return Response(
                         {'error': 'No data returned from service.'},
                         status=status.HTTP_204_NO_CONTENT,
                     )
-                return Response(result, status=status.HTTP_200_OK)
+                return _set_validators(Response(result, status=status.HTTP_200_OK), validators)
 
             except ValidationError as e:
                 LOGGER.exception('Ошибка в функции service')
@@ -85,6 +226,34 @@ class ScheduleTeacherView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BatchScheduleView(APIView):
+    """Представление для получения расписаний на несколько дат одним запросом."""
+
+    @staticmethod
+    def get(request: Request) -> Response:
+        """Обрабатывает GET-запросы с датами, группами и преподавателями, возвращая расписания."""
+        serializer = BatchScheduleSerializer(data=request.query_params)
+        if serializer.is_valid():
+            try:
+                result = batch_schedule(**serializer.validated_data)
+                return Response(result, status=status.HTTP_200_OK)
+
+            except ValidationError as e:
+                LOGGER.exception('Ошибка в функции batch_schedule')
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            except Exception as ex:
+                LOGGER.exception('Неожиданная ошибка в функции batch_schedule')
+                return Response(
+                    {'error': str(ex)},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class FileListView(APIView):
     """Представление для получения списка файлов."""
 
@@ -127,3 +296,209 @@ class FioView(APIView):
                 )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class RoomScheduleView(APIView):
+    """Представление для получения занятий в кабинете."""
+
+    @staticmethod
+    def get(request: Request) -> Response:
+        """Обрабатывает GET-запросы с датой и кабинетом, возвращая занятия в нем."""
+        serializer = RoomRequestSerializer(data=request.query_params)
+        if serializer.is_valid():
+            try:
+                result = room_schedule(
+                    serializer.validated_data['date'], serializer.validated_data['room'],
+                )
+                if result is None:
+                    return Response({'error': 'Файл не найден.'}, status=status.HTTP_404_NOT_FOUND)
+                return Response(RoomScheduleSerializer(result).data, status=status.HTTP_200_OK)
+
+            except ValidationError as e:
+                LOGGER.exception('Ошибка в функции room_schedule')
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            except Exception as ex:
+                LOGGER.exception('Неожиданная ошибка в функции room_schedule')
+                return Response(
+                    {'error': str(ex)},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class FreeRoomsView(APIView):
+    """Представление для получения кабинетов, свободных на паре."""
+
+    @staticmethod
+    def get(request: Request) -> Response:
+        """Обрабатывает GET-запросы с датой и номером пары, возвращая свободные кабинеты."""
+        serializer = FreeRoomsRequestSerializer(data=request.query_params)
+        if serializer.is_valid():
+            try:
+                result = free_rooms(
+                    serializer.validated_data['date'], serializer.validated_data['pair'],
+                )
+                if result is None:
+                    return Response({'error': 'Файл не найден.'}, status=status.HTTP_404_NOT_FOUND)
+                return Response(FreeRoomsSerializer(result).data, status=status.HTTP_200_OK)
+
+            except ValidationError as e:
+                LOGGER.exception('Ошибка в функции free_rooms')
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            except Exception as ex:
+                LOGGER.exception('Неожиданная ошибка в функции free_rooms')
+                return Response(
+                    {'error': str(ex)},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ScheduleChangesView(APIView):
+    """Представление для получения изменений расписания с заданной версии файла."""
+
+    @staticmethod
+    def get(request: Request) -> Response:
+        """Обрабатывает GET-запросы с датой и версией, возвращая изменения в новых версиях."""
+        serializer = ChangesRequestSerializer(data=request.query_params)
+        if serializer.is_valid():
+            try:
+                data = serializer.validated_data
+                result = schedule_changes(
+                    data['date'], data['since'], data.get('group'), data.get('teacher'),
+                )
+                if result is None:
+                    return Response({'error': 'Файл не найден.'}, status=status.HTTP_404_NOT_FOUND)
+                return Response(ScheduleChangesSerializer(result).data, status=status.HTTP_200_OK)
+
+            except ValidationError as e:
+                LOGGER.exception('Ошибка в функции schedule_changes')
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            except Exception as ex:
+                LOGGER.exception('Неожиданная ошибка в функции schedule_changes')
+                return Response(
+                    {'error': str(ex)},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class MetricsView(View):
+    """Представление для получения метрик в текстовом формате Prometheus."""
+
+    @staticmethod
+    def get(request: HttpRequest) -> HttpResponse:
+        """Обрабатывает GET-запросы, возвращая текущие значения метрик процесса."""
+        return HttpResponse(
+            REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+class AsyncServiceView(View):
+    """Асинхронное представление для получения расписания по группе."""
+
+    @staticmethod
+    async def get(request: HttpRequest) -> HttpResponseBase:
+        """Обрабатывает GET-запросы с датой и именем группы, не блокируя поток."""
+        serializer = ScheduleRequestSerializer(data=request.GET)
+        if serializer.is_valid():
+            name = serializer.validated_data['date']
+            group = serializer.validated_data['group']
+            structured = serializer.validated_data['structured']
+            try:
+                return await limited(_aschedule_response(
+                    request,
+                    'group',
+                    name,
+                    group,
+                    render=aservice,
+                    structure=astructured_service if structured else None,
+                ))
+
+            except asyncio.TimeoutError:
+                LOGGER.exception('Превышено время ожидания в функции service')
+                return _json_response(
+                    {'error': 'Schedule service timed out.'},
+                    status.HTTP_504_GATEWAY_TIMEOUT,
+                )
+            except ValidationError as e:
+                LOGGER.exception('Ошибка в функции service')
+                return _json_response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+            except Exception as ex:
+                LOGGER.exception('Неожиданная ошибка в функции service')
+                return _json_response({'error': str(ex)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return _json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncScheduleTeacherView(View):
+    """Асинхронное представление для получения расписания по преподавателю."""
+
+    @staticmethod
+    async def get(request: HttpRequest) -> HttpResponseBase:
+        """Обрабатывает GET-запросы с датой и именем преподавателя, не блокируя поток."""
+        serializer = ScheduleTeacherSeriaizer(data=request.GET)
+        if serializer.is_valid():
+            date = serializer.validated_data['date']
+            teachers_name = serializer.validated_data['group']
+            structured = serializer.validated_data['structured']
+            try:
+                return await limited(_aschedule_response(
+                    request,
+                    'teacher',
+                    date,
+                    teachers_name,
+                    render=asearch_schedule_by_teacher,
+                    structure=astructured_search_schedule_by_teacher if structured else None,
+                ))
+
+            except asyncio.TimeoutError:
+                LOGGER.exception('Превышено время ожидания в функции service')
+                return _json_response(
+                    {'error': 'Schedule service timed out.'},
+                    status.HTTP_504_GATEWAY_TIMEOUT,
+                )
+            except ValidationError as e:
+                LOGGER.exception('Ошибка в функции service')
+                return _json_response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+            except Exception as ex:
+                LOGGER.exception('Неожиданная ошибка в функции service')
+                return _json_response({'error': str(ex)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return _json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncFileListView(View):
+    """Асинхронное представление для получения списка файлов."""
+
+    @staticmethod
+    async def get(request: HttpRequest) -> JsonResponse:
+        """Обрабатывает GET-запросы, возвращая список файлов с Google Drive."""
+        try:
+            files = await limited(aget_filenames())
+            return _json_response(files)
+
+        except asyncio.TimeoutError:
+            LOGGER.exception('Превышено время ожидания в функции get_filenames')
+            return _json_response(
+                {'error': 'Schedule service timed out.'},
+                status.HTTP_504_GATEWAY_TIMEOUT,
+            )
+        except ValidationError as e:
+            LOGGER.exception('Ошибка в функции get_filenames')
+            return _json_response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+        except Exception as ex:
+            LOGGER.exception('Неожиданная ошибка в функции get_filenames')
+            return _json_response({'error': str(ex)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
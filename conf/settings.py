@@ -27,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.bot.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -116,3 +117,61 @@ ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '').split(',')
 DEBUG = os.getenv('DEBUG', 'False') == 'True'
 
 SECRET_KEY = os.getenv('SECRET_KEY')
+
+#
+# Schedule
+#
+SCHEDULE_LISTING_TTL = int(os.getenv('SCHEDULE_LISTING_TTL', '60'))
+
+SCHEDULE_DRIVE_TIMEOUT = int(os.getenv('SCHEDULE_DRIVE_TIMEOUT', '30'))
+
+SCHEDULE_LOCAL_FOLDER = os.getenv('SCHEDULE_LOCAL_FOLDER')
+
+SCHEDULE_LOCAL_FOLDER_LATENCY = float(os.getenv('SCHEDULE_LOCAL_FOLDER_LATENCY', '0'))
+
+SCHEDULE_LOCAL_FOLDER_ERROR_RATE = float(os.getenv('SCHEDULE_LOCAL_FOLDER_ERROR_RATE', '0'))
+
+SCHEDULE_MIRROR_DIR = Path(os.getenv('SCHEDULE_MIRROR_DIR', BASE_DIR / 'schedules'))
+
+SCHEDULE_USE_MIRROR = os.getenv('SCHEDULE_USE_MIRROR', 'False') == 'True'
+
+SCHEDULE_ASYNC_IO_WORKERS = int(os.getenv('SCHEDULE_ASYNC_IO_WORKERS', '64'))
+
+SCHEDULE_ASYNC_MAX_CONCURRENCY = int(os.getenv('SCHEDULE_ASYNC_MAX_CONCURRENCY', '500'))
+
+SCHEDULE_ASYNC_TIMEOUT = float(os.getenv('SCHEDULE_ASYNC_TIMEOUT', '30'))
+
+SCHEDULE_PARSE_WORKERS = int(os.getenv('SCHEDULE_PARSE_WORKERS', '2'))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+}
+
+SCHEDULE_CACHE_ALIAS = 'default'
+
+SCHEDULE_RESPONSE_CACHE_TTL = int(os.getenv('SCHEDULE_RESPONSE_CACHE_TTL', '3600'))
+
+SCHEDULE_BATCH_MAX_DATES = int(os.getenv('SCHEDULE_BATCH_MAX_DATES', '14'))
+
+SCHEDULE_BATCH_MAX_QUERIES = int(os.getenv('SCHEDULE_BATCH_MAX_QUERIES', '20'))
+
+SCHEDULE_BATCH_WORKERS = int(os.getenv('SCHEDULE_BATCH_WORKERS', '8'))
+
+SCHEDULE_FILE_DATE_FORMAT = os.getenv('SCHEDULE_FILE_DATE_FORMAT', '%d.%m.%Y')
+
+SCHEDULE_SLOW_REQUEST_SECONDS = float(os.getenv('SCHEDULE_SLOW_REQUEST_SECONDS', '0'))
+
+SCHEDULE_CONTENT_CACHE_BYTES = int(os.getenv('SCHEDULE_CONTENT_CACHE_BYTES', str(64 * 1024 * 1024)))
+
+SCHEDULE_CONTENT_SPILL_DIR = os.getenv('SCHEDULE_CONTENT_SPILL_DIR')
+
+SCHEDULE_CONTENT_SPILL_BYTES = int(
+    os.getenv('SCHEDULE_CONTENT_SPILL_BYTES', str(512 * 1024 * 1024)),
+)
+
+SCHEDULE_PREWARM = os.getenv('SCHEDULE_PREWARM', 'False') == 'True'
+
+SCHEDULE_PREWARM_RENDER = os.getenv('SCHEDULE_PREWARM_RENDER', 'False') == 'True'